@@ -0,0 +1,102 @@
+# Accuracy-vs-speed report: Barnes-Hut tree against the direct pairwise sum
+#
+# Starts from the Alpha Centauri initial conditions of 3body.py and adds
+# random low-mass satellites around the stars.
+#
+#   python benchmarks/barnes_hut_report.py --sizes 100 1000 2000 --thetas 0.3 0.5 0.7
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np  # For numerical calculations
+import scipy.integrate  # For numerical integration (ODE Solvers)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from nbody.equations import nbody_accelerations, nbody_derivatives  # noqa: E402
+from nbody.barnes_hut import barnes_hut_accelerations, barnes_hut_derivatives  # noqa: E402
+from nbody.constants import K1, K2  # noqa: E402
+from nbody.scenarios import initial_conditions  # noqa: E402
+
+
+
+def alpha_centauri_cluster(n_bodies, seed=0):
+    """
+    Function to build the 3body.py initial conditions plus random satellites
+    :param n_bodies: Total number of bodies (at least 3)
+    :param seed: Random seed for the satellites
+    :return: Tuple (masses, positions, velocities)
+    """
+    rng = np.random.default_rng(seed)
+    masses, r, v, _ = initial_conditions("3body")
+
+    # Each satellite starts on a circular orbit around one of the stars
+    n_sat = n_bodies - 3
+    host = rng.integers(0, 3, n_sat)
+    radius = rng.uniform(0.1, 0.3, n_sat)
+    direction = rng.normal(size=(n_sat, 3))
+    direction /= np.linalg.norm(direction, axis=1, keepdims=True)
+    tangent = np.cross(direction, rng.normal(size=(n_sat, 3)))
+    tangent /= np.linalg.norm(tangent, axis=1, keepdims=True)
+    speed = np.sqrt(K1 * masses[host] / (K2 * radius))
+
+    masses = np.concatenate((masses, rng.uniform(1e-6, 1e-4, n_sat)))
+    r = np.vstack((r, r[host] + radius[:, np.newaxis] * direction))
+    v = np.vstack((v, v[host] + speed[:, np.newaxis] * tangent))
+    return masses, r, v
+
+
+def best_time(func, repeat):
+    """
+    Function to time a call, keeping the fastest of several runs
+    :param func: Callable without arguments
+    :param repeat: Number of runs
+    :return: Tuple (result, seconds)
+    """
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Accuracy and speed of Barnes-Hut against the direct pairwise sum")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 500, 1000, 2000])
+    parser.add_argument("--thetas", type=float, nargs="+", default=[0.3, 0.5, 0.7, 1.0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--orbit-bodies", type=int, default=100, help="bodies in the short odeint comparison")
+    args = parser.parse_args()
+
+    print("Acceleration error of Barnes-Hut relative to the direct sum")
+    print(f"{'N':>7} {'theta':>6} {'direct s':>10} {'tree s':>10} {'speedup':>8} {'median err':>11} {'99% err':>10}")
+    for n in args.sizes:
+        masses, r, _ = alpha_centauri_cluster(n)
+        exact, t_direct = best_time(lambda: nbody_accelerations(r, masses, K1), args.repeat)
+        norm = np.linalg.norm(exact, axis=1)
+        for theta in args.thetas:
+            approx, t_tree = best_time(lambda: barnes_hut_accelerations(r, masses, K1, theta=theta), args.repeat)
+            err = np.linalg.norm(approx - exact, axis=1) / norm
+            print(f"{n:>7} {theta:>6.2f} {t_direct:>10.4f} {t_tree:>10.4f} {t_direct / t_tree:>8.2f} "
+                  f"{np.median(err):>11.2e} {np.percentile(err, 99):>10.2e}")
+
+    # Short integration: how far do the three stars drift from the direct-sum orbit?
+    masses, r, v = alpha_centauri_cluster(args.orbit_bodies)
+    init_params = np.concatenate((r.ravel(), v.ravel()))
+    time_span = np.linspace(0, 0.2, 10)
+    exact, t_direct = best_time(lambda: scipy.integrate.odeint(
+        nbody_derivatives, init_params, time_span, args=(masses, K1, K2)), 1)
+    stars = exact[-1, :9].reshape(3, 3)
+    print(f"\nodeint over 0.2 periods with {args.orbit_bodies} bodies (direct sum: {t_direct:.2f} s)")
+    print(f"{'theta':>6} {'tree s':>10} {'star position error':>20}")
+    for theta in args.thetas:
+        approx, t_tree = best_time(lambda: scipy.integrate.odeint(
+            barnes_hut_derivatives, init_params, time_span, args=(masses, K1, K2, None, theta)), 1)
+        drift = np.linalg.norm(approx[-1, :9].reshape(3, 3) - stars, axis=1).max()
+        print(f"{theta:>6.2f} {t_tree:>10.2f} {drift:>20.2e}")
+
+
+if __name__ == "__main__":
+    main()
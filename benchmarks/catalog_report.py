@@ -0,0 +1,98 @@
+# Catalog report: cost of one solar system frame against the number of bodies
+#
+# Times the ephemeris lookup of every body and the full frame (lookup, trail
+# update and Agg draw) for the planets plus a growing asteroid belt. Then times
+# the blitted frames of the co-moving solar system scene drawn with mplot3d
+# artists and with the projected 2D renderer (nbody/projection.py).
+#
+#   python benchmarks/catalog_report.py --asteroids 0 800 8000
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np  # For numerical calculations
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from nbody.catalog import asteroid_belt, load_catalog  # noqa: E402
+from nbody.ephemeris import EPHEMERIS_RESOLUTION, interpolate, load_table  # noqa: E402
+from nbody.frames import Blitter, agg_figure  # noqa: E402
+from nbody.render import TrailBuffer, _matplotlib, solar_system_scene  # noqa: E402
+
+
+def time_frames(bodies, frames, trail_length, dpi):
+    """
+    Function timing the lookup and the full frame for one catalog
+    :return: Tuple (seconds per lookup, seconds per frame)
+    """
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection
+    plt, _ = _matplotlib()
+
+    table = load_table(bodies["e"], cache_dir=None)
+    planet_frames = bodies["period"].astype(int)
+    positions = np.zeros((len(bodies), 3))
+    trail = TrailBuffer(trail_length, len(bodies))
+
+    fig = plt.figure(dpi=dpi)
+    ax = fig.add_subplot(111, projection="3d")
+    paths = Line3DCollection([], colors=list(bodies["color"]))
+    ax.add_collection(paths)
+    markers = ax.scatter(*positions.T, c=list(bodies["color"]), s=16, depthshade=False)
+    a_outer = bodies["a"].max()
+    ax.set_xlim(-a_outer, a_outer)
+    ax.set_ylim(-a_outer, a_outer)
+    ax.set_zlim(-a_outer, a_outer)
+
+    start = time.perf_counter()
+    for i in range(frames):
+        interpolate(table, i / planet_frames, bodies["a"])
+    t_lookup = (time.perf_counter() - start) / frames
+
+    start = time.perf_counter()
+    for i in range(frames):
+        positions[:] = interpolate(table, i / planet_frames, bodies["a"])
+        markers._offsets3d = tuple(positions.T)
+        trail.append(positions)
+        paths.set_segments(trail.view().swapaxes(0, 1))
+        fig.canvas.draw()
+    t_frame = (time.perf_counter() - start) / frames
+    plt.close(fig)
+    return t_lookup, t_frame
+
+
+def time_scene(bodies, frames, trail_length, dpi, projected):
+    """
+    Function timing the blitted frames of the co-moving solar system scene
+    :return: Seconds per frame
+    """
+    fig = agg_figure((6.4, 4.8), dpi)
+    animate, _ = solar_system_scene(fig, bodies, 50, trail_length, EPHEMERIS_RESOLUTION, None, frames, True, projected)
+    blitter = Blitter(fig)
+    blitter.grab(animate(0))  # Draws the background
+    start = time.perf_counter()
+    for i in range(1, frames):
+        blitter.grab(animate(i))
+    return (time.perf_counter() - start) / (frames - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of one solar system frame against the number of bodies")
+    parser.add_argument("--asteroids", type=int, nargs="+", default=[0, 800, 8000])
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument("--trail-length", type=int, default=20)
+    parser.add_argument("--dpi", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'bodies':>7} {'lookup (ms)':>12} {'frame (ms)':>11} {'mplot3d (ms)':>13} {'projected (ms)':>15}")
+    for count in args.asteroids:
+        bodies = np.concatenate([load_catalog(), asteroid_belt(count, seed=0)])
+        t_lookup, t_frame = time_frames(bodies, args.frames, args.trail_length, args.dpi)
+        t_mplot3d, t_projected = (time_scene(bodies, args.frames, args.trail_length, args.dpi, projected)
+                                  for projected in (False, True))
+        print(f"{len(bodies):>7} {t_lookup * 1e3:>12.3f} {t_frame * 1e3:>11.1f} "
+              f"{t_mplot3d * 1e3:>13.1f} {t_projected * 1e3:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
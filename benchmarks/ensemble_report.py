@@ -0,0 +1,80 @@
+# Ensemble report: throughput of batched integration of perturbed 3body.py systems
+#
+# Every member is a Gaussian perturbation of the 3body.py initial conditions.
+# The batched run advances all members in one array pass; for comparison a
+# few members are also integrated one at a time with the same fixed-step
+# integrator and with odeint.
+#
+#   python benchmarks/ensemble_report.py --members 100 1000 10000
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np  # For numerical calculations
+import scipy.integrate  # For numerical integration (ODE Solvers)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from nbody.equations import nbody_derivatives  # noqa: E402
+from nbody.ensemble import integrate_ensemble, perturbed_ensemble  # noqa: E402
+from nbody.constants import K1, K2  # noqa: E402
+from nbody.scenarios import initial_conditions  # noqa: E402
+
+
+# Initial conditions of 3body.py
+masses, r0, v0, _ = initial_conditions("3body")
+
+
+def com_velocity(v):
+    """
+    Function to find the centre-of-mass velocity of every member, as 3body.py does
+    :param v: Velocities, shape (M, N, 3)
+    :return: Array of shape (M, 1, 3)
+    """
+    return (masses[:, np.newaxis] * v).sum(axis=-2, keepdims=True) / masses.sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of batched integration of perturbed 3body.py systems")
+    parser.add_argument("--members", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--periods", type=float, default=5.0)
+    parser.add_argument("--dt", type=float, default=0.005)
+    parser.add_argument("--method", default="yoshida4", choices=["leapfrog", "yoshida4"])
+    parser.add_argument("--scale", type=float, default=1e-3, help="perturbation size")
+    parser.add_argument("--serial", type=int, default=5, help="members integrated one at a time")
+    args = parser.parse_args()
+
+    steps = int(round(args.periods / args.dt))
+    print(f"{args.method}, dt={args.dt}, {steps} steps over {args.periods} periods\n")
+    print(f"{'mode':<22} {'members':>8} {'wall s':>8} {'systems/s':>10} {'escaped':>8} {'min dist':>9}")
+
+    for members in args.members:
+        r, v = perturbed_ensemble(r0, v0, members, scale=args.scale, seed=0)
+        start = time.perf_counter()
+        summary = integrate_ensemble(r, v, masses, K1, K2, args.dt, steps, v_com=com_velocity(v), method=args.method)
+        wall = time.perf_counter() - start
+        print(f"{'batched':<22} {members:>8} {wall:>8.2f} {members / wall:>10.1f} "
+              f"{summary.escaped.mean():>8.1%} {np.median(summary.min_distance):>9.4f}")
+
+    # The same members one system at a time
+    r, v = perturbed_ensemble(r0, v0, args.serial, scale=args.scale, seed=0)
+    start = time.perf_counter()
+    for k in range(args.serial):
+        integrate_ensemble(r[k:k + 1], v[k:k + 1], masses, K1, K2, args.dt, steps,
+                           v_com=com_velocity(v[k:k + 1]), method=args.method)
+    wall = time.perf_counter() - start
+    print(f"{'serial fixed-step':<22} {args.serial:>8} {wall:>8.2f} {args.serial / wall:>10.1f}")
+
+    time_span = np.linspace(0, args.periods, int(args.periods * 25) + 1)  # 25 points per period, as in 3body.py
+    start = time.perf_counter()
+    for k in range(args.serial):
+        init_params = np.concatenate((r[k].ravel(), v[k].ravel()))
+        scipy.integrate.odeint(nbody_derivatives, init_params, time_span,
+                               args=(masses, K1, K2, com_velocity(v[k:k + 1])[0, 0]))
+    wall = time.perf_counter() - start
+    print(f"{'serial odeint':<22} {args.serial:>8} {wall:>8.2f} {args.serial / wall:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# Cold import time of the physics core, compared with its heavy dependencies
+#
+# Every module is imported in a fresh interpreter; the best of several runs is kept.
+# The script fails if importing the core pulls in matplotlib or SciPy.
+#
+#   python benchmarks/import_time.py --repeat 5
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+MODULES = ["numpy", "nbody", "nbody.render", "scipy.integrate", "matplotlib.pyplot"]
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+heavy = sorted(name for name in ("matplotlib", "scipy") if name in sys.modules)
+print(elapsed, ",".join(heavy))
+"""
+
+
+def cold_import(module, repeat):
+    """
+    Function to time the import of a module in fresh interpreters
+    :param module: Dotted module name
+    :param repeat: Number of interpreters to start
+    :return: Tuple (best seconds, heavy packages loaded as a side effect)
+    """
+    best, heavy = float("inf"), ""
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", PROBE.format(module=module)], cwd=ROOT,
+                             capture_output=True, text=True, check=True).stdout.split()
+        best = min(best, float(out[0]))
+        heavy = out[1] if len(out) > 1 else ""
+    return best, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold import time of the physics core and its heavy dependencies")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'module':<20} {'import ms':>10}  also loaded")
+    results = {}
+    for module in MODULES:
+        results[module] = cold_import(module, args.repeat)
+        seconds, heavy = results[module]
+        print(f"{module:<20} {seconds * 1000:>10.1f}  {heavy}")
+
+    for module in ("nbody", "nbody.render"):
+        if results[module][1]:
+            sys.exit(f"{module} must not import {results[module][1]} at import time")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Integrator report: odeint (LSODA) against the fixed-step symplectic integrators
+#
+# Runs the 2-, 3- and 4-body initial conditions of the scripts over the same
+# 30-period, 750-point time_span and compares right-hand-side (force)
+# evaluations, wall time and the worst relative energy error. Only the 2-body
+# orbit is smooth enough for the fixed-step errors to fall with their order;
+# the close encounters of the 3- and 4-body systems leave them large (and not
+# always falling) at 16 substeps, which is why the scripts default to odeint.
+#
+#   python benchmarks/integrator_report.py --substeps 1 4 16
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np  # For numerical calculations
+import scipy.integrate  # For numerical integration (ODE Solvers)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from nbody.equations import nbody_derivatives, total_energy  # noqa: E402
+from nbody.integrators import fixed_step_solve  # noqa: E402
+from nbody.constants import K1, K2  # noqa: E402
+from nbody.scenarios import SCENARIOS, initial_conditions  # noqa: E402
+
+
+def energy_error(sol, masses):
+    """
+    Function to find the worst relative energy error along a solution
+    :param sol: Solution array of shape (T, 6N)
+    :param masses: Masses of the N bodies
+    :return: max |E(t) - E(0)| / |E(0)|
+    """
+    state = sol.reshape(len(sol), 2, len(masses), 3)
+    energy = total_energy(state[:, 0], state[:, 1], masses, K1, K2)
+    return np.abs((energy - energy[0]) / energy[0]).max()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare odeint (LSODA) with the fixed-step symplectic integrators")
+    parser.add_argument("--substeps", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    time_span = np.linspace(0, 30, 750)  # 30 orbital periods and 750 points
+    print(f"{'system':<17} {'integrator':<20} {'RHS evals':>10} {'wall s':>8} {'energy err':>11}")
+    for name in SCENARIOS:
+        masses, r, v, v_com = initial_conditions(name)
+        init_params = np.concatenate((r.ravel(), v.ravel()))
+
+        start = time.perf_counter()
+        sol, info = scipy.integrate.odeint(nbody_derivatives, init_params, time_span,
+                                           args=(masses, K1, K2, v_com), full_output=True)
+        wall = time.perf_counter() - start
+        print(f"{name:<17} {'odeint':<20} {info['nfe'][-1]:>10} {wall:>8.3f} {energy_error(sol, masses):>11.2e}")
+
+        for method, calls_per_step in (("leapfrog", 1), ("yoshida4", 3)):
+            for substeps in args.substeps:
+                start = time.perf_counter()
+                sol = fixed_step_solve(method, init_params, time_span, masses, K1, K2, v_com, substeps=substeps)
+                wall = time.perf_counter() - start
+                evals = calls_per_step * (len(time_span) - 1) * substeps + (method == "leapfrog")
+                label = f"{method} x{substeps}"
+                print(f"{name:<17} {label:<20} {evals:>10} {wall:>8.3f} {energy_error(sol, masses):>11.2e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Jacobian report: odeint with the analytic Jacobian against finite differences
+#
+# LSODA starts with its non-stiff (Adams) method and switches to the stiff
+# (BDF) one when the step size is limited by stability; every BDF Jacobian
+# then costs 6N extra right-hand-side calls unless Dfun supplies it. Runs the
+# 2-, 3- and 4-body initial conditions of the scripts, plus the 4-body system
+# with its planet on a tight circular orbit around the first star (the close
+# approaches that push LSODA into stiff mode), over the same 30-period,
+# 750-point time_span.
+#
+#   python benchmarks/jacobian_report.py --radii 0.1 0.03 0.01
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np  # For numerical calculations
+import scipy.integrate  # For numerical integration (ODE Solvers)
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from nbody.equations import nbody_derivatives, nbody_jacobian  # noqa: E402
+from nbody.constants import K1, K2  # noqa: E402
+from nbody.scenarios import SCENARIOS, initial_conditions  # noqa: E402
+
+
+def tight_orbit(radius):
+    """
+    Function to put the planet of 3body_with_earth.py on a circular orbit around the first star
+    :param radius: Orbital radius
+    :return: Tuple (masses, r, v, v_com) as initial_conditions returns
+    """
+    masses, r, v, _ = initial_conditions("3body_with_earth")
+    speed = np.sqrt(K1 * masses[0] / (K2 * radius))  # K2 v^2 / radius = K1 m1 / radius^2
+    return initial_conditions("3body_with_earth", r4=list(r[0] + [0, radius, 0]), v4=list(v[0] + [speed, 0, 0]))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare odeint with the analytic Jacobian and finite differences")
+    parser.add_argument("--radii", type=float, nargs="+", default=[0.1, 0.03],
+                        help="orbital radii of the planet around the first star")
+    args = parser.parse_args()
+
+    systems = {name: initial_conditions(name) for name in SCENARIOS}
+    systems.update((f"planet at {radius:g}", tight_orbit(radius)) for radius in args.radii)
+
+    time_span = np.linspace(0, 30, 750)  # 30 orbital periods and 750 points
+    print(f"{'system':<17} {'Jacobian':<10} {'RHS evals':>10} {'Jacobians':>10} {'stiff':>6} {'wall s':>8} "
+          f"{'max diff':>9}")
+    for name, (masses, r, v, v_com) in systems.items():
+        init_params = np.concatenate((r.ravel(), v.ravel()))
+        reference = None
+        for label, dfun in (("finite", None), ("analytic", nbody_jacobian)):
+            start = time.perf_counter()
+            sol, info = scipy.integrate.odeint(nbody_derivatives, init_params, time_span, args=(masses, K1, K2, v_com),
+                                               Dfun=dfun, full_output=True, mxstep=10 ** 6)
+            wall = time.perf_counter() - start
+            reference = sol if reference is None else reference
+            stiff = (info["mused"] == 2).sum()  # Output intervals finished by the stiff method
+            print(f"{name:<17} {label:<10} {info['nfe'][-1]:>10} {info['nje'][-1]:>10} {stiff:>6} {wall:>8.3f} "
+                  f"{np.abs(sol - reference).max():>9.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Kepler report: the old scalar fixed-point solver against the vectorized Newton solver
+#
+# Times the positions of all planets of solar_sys.py for every saved frame,
+# and shows how the iteration count of each solver grows with eccentricity.
+#
+#   python benchmarks/kepler_report.py --skip-factor 50
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np  # For numerical calculations
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from nbody.catalog import load_catalog  # noqa: E402
+from nbody.constants import DAY  # noqa: E402
+from nbody.kepler import KEPLER_TOLERANCE, kepler_positions  # noqa: E402
+
+
+def fixed_point_position(t, a, e, T):
+    """
+    Function reproducing the original per-call solver of solar_sys.py
+    :return: Tuple (x, y, z, iterations)
+    """
+    M = 2 * np.pi / T * t
+    E = M
+    E_next = M + e * np.sin(E)
+    iterations = 1
+    while abs(E - E_next) > 1e-6:
+        E = E_next
+        E_next = M + e * np.sin(E)
+        iterations += 1
+    true_anomaly = 2 * np.arctan2(np.sqrt(1 + e) * np.tan(E / 2), np.sqrt(1 - e))
+    r = a * (1 - e * np.cos(E))
+    return r * np.cos(true_anomaly), 0, r * np.sin(true_anomaly), iterations
+
+
+def newton_iterations(M, e):
+    """
+    Function counting the Newton iterations solve_kepler needs for the worst entry
+    """
+    M = np.mod(M + np.pi, 2 * np.pi) - np.pi
+    E = M + 0.85 * e * np.sign(np.sin(M))
+    for iterations in range(1, 100):
+        step = (E - e * np.sin(E) - M) / (1 - e * np.cos(E))
+        E -= step
+        if np.abs(step).max() <= KEPLER_TOLERANCE:
+            return iterations
+    return iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the fixed-point and vectorized Newton Kepler solvers")
+    parser.add_argument("--skip-factor", type=int, default=50)
+    parser.add_argument("--orbital-factor", type=float, default=0.5)
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    planets = [(a, e, args.orbital_factor * days * DAY)
+               for a, e, days in zip(catalog["a"], catalog["e"], catalog["period"])]
+    planet_frames = np.array([int(T / DAY) for _, _, T in planets])
+    total_frames = planet_frames.max()
+    a, e, T = (np.array(column) for column in zip(*planets))
+    times = (np.arange(total_frames) * args.skip_factor)[:, np.newaxis] * T / planet_frames
+
+    start = time.perf_counter()
+    scalar = np.array([[fixed_point_position(t, *planet)[:3] for t, planet in zip(row, planets)] for row in times])
+    t_scalar = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vector = kepler_positions(times, a, e, T)
+    t_vector = time.perf_counter() - start
+
+    error = (np.linalg.norm(vector - scalar, axis=-1) / a).max()
+    print(f"{total_frames} frames x {len(planets)} planets")
+    print(f"  scalar fixed point: {t_scalar:8.3f} s")
+    print(f"  vectorized Newton:  {t_vector:8.3f} s  ({t_scalar / t_vector:.0f}x faster, max difference {error:.1e} a)")
+
+    print(f"\n{'e':>9} {'fixed-point iters':>18} {'Newton iters':>13}")
+    M = np.linspace(-np.pi, np.pi, 10001)
+    for ecc in (0.01, 0.2, 0.5, 0.9, 0.99, 0.999):
+        worst = max(fixed_point_position(m, 1.0, ecc, 2 * np.pi)[3] for m in M)
+        print(f"{ecc:>9} {worst:>18} {newton_iterations(M, ecc):>13}")
+
+
+if __name__ == "__main__":
+    main()
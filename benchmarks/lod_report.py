@@ -0,0 +1,70 @@
+# LOD report: vertices drawn and frame time of the solar system orbits with and without trail simplification
+#
+# Draws the co-moving, blitted solar system scene with the whole-run trails of
+# the catalog plus an asteroid belt, once with every trail point and once per
+# requested tolerance in pixels (see nbody.render.DecimatedTrail). Reports the
+# vertices handed to Matplotlib per frame, the time per frame and how many
+# pixels of the last frame differ visibly from the full drawing.
+#
+#   python benchmarks/lod_report.py --frames 1000 --asteroids 500 --lod 0.5 1 2 [--projected]
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np  # For numerical calculations
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from nbody.catalog import asteroid_belt, load_catalog  # noqa: E402
+from nbody.ephemeris import EPHEMERIS_CACHE, EPHEMERIS_RESOLUTION  # noqa: E402
+from nbody.frames import Blitter, agg_figure  # noqa: E402
+from nbody.render import solar_system_scene  # noqa: E402
+
+
+def time_scene(bodies, args, lod):
+    """
+    Function to draw the frames of the scene
+    :return: Tuple (milliseconds per frame, vertices drawn per frame, last frame as an RGB array)
+    """
+    fig = agg_figure((6.4, 4.8), args.dpi)
+    animate, _ = solar_system_scene(fig, bodies, args.skip_factor, None, EPHEMERIS_RESOLUTION, EPHEMERIS_CACHE,
+                                    args.frames, True, args.projected, None, 0.0, lod)
+    blitter = Blitter(fig)
+    start = time.perf_counter()
+    for i in range(args.frames):
+        frame = blitter.grab(animate(i))
+    elapsed = (time.perf_counter() - start) / args.frames * 1e3
+    if animate.decimated is None:
+        # Every trail point of every body: frame i draws i + 1 points per trail
+        vertices = (len(bodies) + 1) * (args.frames + 1) / 2
+    else:
+        vertices = animate.decimated.drawn / args.frames
+    return elapsed, vertices, np.array(frame)[..., :3].astype(int)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Vertices and frame time of solar system orbits with and without LOD")
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--asteroids", type=int, default=500)
+    parser.add_argument("--skip-factor", type=float, default=2)
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--lod", type=float, nargs="+", default=[0.5, 1, 2], help="tolerances in pixels")
+    parser.add_argument("--projected", action="store_true", help="draw with nbody.projection instead of mplot3d")
+    args = parser.parse_args()
+
+    bodies = np.concatenate([load_catalog(), asteroid_belt(args.asteroids, seed=0)])
+    print(f"{len(bodies) + 1} trails over {args.frames} frames at dpi {args.dpi} "
+          f"({'projected' if args.projected else 'mplot3d'})\n")
+
+    print(f"{'lod (px)':>9} {'vertices/frame':>15} {'reduction':>10} {'ms/frame':>9} {'pixels off':>11}")
+    full_time, full_vertices, full_frame = time_scene(bodies, args, None)
+    print(f"{'-':>9} {full_vertices:>15.0f} {1:>9.1f}x {full_time:>9.1f} {0:>11}")
+    for lod in args.lod:
+        elapsed, vertices, frame = time_scene(bodies, args, lod)
+        off = int((np.abs(frame - full_frame).max(axis=-1) > 32).sum())  # Visibly different pixels
+        print(f"{lod:>9g} {vertices:>15.0f} {full_vertices / vertices:>9.1f}x {elapsed:>9.1f} {off:>11}")
+
+
+if __name__ == "__main__":
+    main()
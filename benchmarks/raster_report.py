@@ -0,0 +1,61 @@
+# Raster report: frame time of the NumPy rasterizer against the number of particles
+#
+# Draws a disc-shaped star field slowly turning in front of the camera, with
+# solid and glowing particles, and optionally saves the largest run through
+# the frame sinks (.gif, or .mp4 / .webm with ffmpeg).
+#
+#   python benchmarks/raster_report.py --particles 10000 100000 1000000 --output stars.mp4
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np  # For numerical calculations
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from nbody.raster import raster_frames, save_raster  # noqa: E402
+
+
+def star_field(particles, frames, seed=0):
+    """
+    Function to build a thin disc of particles turning about the z-axis
+    :return: Positions, shape (frames, particles, 3), float32
+    """
+    rng = np.random.default_rng(seed)
+    disc = rng.normal(size=(particles, 3)).astype(np.float32) * np.float32([1, 1, 0.1])
+    positions = np.empty((frames, particles, 3), dtype=np.float32)
+    for i, angle in enumerate(np.linspace(0, 0.5, frames)):
+        c, s = np.cos(angle), np.sin(angle)
+        positions[i] = disc @ np.float32([[c, s, 0], [-s, c, 0], [0, 0, 1]])
+    return positions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame time of the NumPy rasterizer against the number of particles")
+    parser.add_argument("--particles", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--frames", type=int, default=10)
+    parser.add_argument("--size", type=int, default=720)
+    parser.add_argument("--output", help="save the largest star field to this file")
+    args = parser.parse_args()
+
+    print(f"{'particles':>10} {'solid (ms)':>11} {'glow (ms)':>10}")
+    for particles in args.particles:
+        positions = star_field(particles, args.frames)
+        colors = np.full((particles, 3), 0.15)
+        times = []
+        for glow in (False, True):
+            start = time.perf_counter()
+            for _ in raster_frames(positions, colors, args.size, args.size, trail_length=0, glow=glow):
+                pass
+            times.append((time.perf_counter() - start) / args.frames)
+        print(f"{particles:>10} {times[0] * 1e3:>11.1f} {times[1] * 1e3:>10.1f}")
+
+    if args.output:
+        start = time.perf_counter()
+        save_raster(positions, args.output, colors, width=args.size, height=args.size, trail_length=0, glow=True)
+        print(f"\nsaved {args.output} in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# Render report: wall time of saving the solar system animation against worker processes and output format
+#
+# Renders the first frames of solar_sys.py with 1, 2, 4, ... processes and
+# checks that every run writes the same GIF. The time spent drawing alone shows
+# how much of a serial save the background encoder can hide, with and without
+# blitting (and how often the blitted background had to be redrawn). Then saves
+# the same frames as every requested format (videos need ffmpeg) and compares
+# time and size.
+#
+#   python benchmarks/render_report.py --frames 200 --workers 1 2 4 8 --formats .gif .mp4 .webm [--co-moving]
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np  # For numerical calculations
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+from nbody.catalog import load_catalog  # noqa: E402
+from nbody.ephemeris import EPHEMERIS_CACHE, EPHEMERIS_RESOLUTION  # noqa: E402
+from nbody.frames import Blitter, agg_figure, render_frames  # noqa: E402
+from nbody.render import solar_system_scene  # noqa: E402
+from nbody.sinks import open_sink  # noqa: E402
+
+
+def save(filename, scene_args, frames, figsize, dpi, workers=1):
+    """
+    Function to save the solar system frames through the sink chosen by the filename
+    :return: Wall time (seconds)
+    """
+    start = time.perf_counter()
+    with open_sink(filename) as sink:
+        for frame in render_frames(solar_system_scene, scene_args, frames, figsize, dpi, workers, prepare=sink.prepare):
+            sink.write(frame)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wall time of saving the solar system against workers and format")
+    parser.add_argument("--frames", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count()])
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--skip-factor", type=int, default=50)
+    parser.add_argument("--formats", nargs="+", default=[".gif", ".mp4", ".webm"])
+    parser.add_argument("--co-moving", action="store_true", help="draw in the Sun's frame with fixed axes")
+    args = parser.parse_args()
+
+    bodies = load_catalog()
+    bodies["period"] *= 0.5
+    scene_args = (bodies, args.skip_factor, None, EPHEMERIS_RESOLUTION, EPHEMERIS_CACHE, None, args.co_moving)
+    figsize = np.array([6.4, 4.8])
+
+    print(f"{args.frames} frames at dpi {args.dpi} ({os.cpu_count()} CPUs, {'co-moving' if args.co_moving else 'panning'} axes)")
+
+    # Drawing alone: with the encoder thread on another core, a serial save should take about this long
+    start = time.perf_counter()
+    for _ in render_frames(solar_system_scene, scene_args, args.frames, figsize, args.dpi):
+        pass
+    print(f"drawing only, 1 process: {time.perf_counter() - start:.2f} s")
+
+    # Blitting: the background is cached and redrawn only when the axes limits change
+    fig = agg_figure(figsize, args.dpi)
+    animate, _ = solar_system_scene(fig, *scene_args)
+    blitter = Blitter(fig)
+    start = time.perf_counter()
+    for i in range(args.frames):
+        blitter.grab(animate(i))
+    print(f"drawing only, blitted: {time.perf_counter() - start:.2f} s "
+          f"(background drawn {blitter.redraws} times)\n")
+
+    print(f"{'workers':>8} {'time (s)':>9} {'speed-up':>9}  GIF digest")
+    reference = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for workers in args.workers:
+            filename = os.path.join(tmp, f"solar_{workers}.gif")
+            elapsed = save(filename, scene_args, args.frames, figsize, args.dpi, workers)
+            reference = reference or elapsed
+            with open(filename, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:12]
+            print(f"{workers:>8} {elapsed:>9.2f} {reference / elapsed:>8.1f}x  {digest}")
+
+        print(f"\n{'format':>8} {'time (s)':>9} {'size (kB)':>10}")
+        for extension in args.formats:
+            filename = os.path.join(tmp, f"solar{extension}")
+            try:
+                elapsed = save(filename, scene_args, args.frames, figsize, args.dpi)
+            except RuntimeError as exc:
+                print(f"{extension:>8}  skipped: {exc}")
+                continue
+            print(f"{extension:>8} {elapsed:>9.2f} {os.path.getsize(filename) / 1e3:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+Physics core for the N-body simulations.
+
+The scripts at the top of the repository (2body.py, 3body.py, ...) are thin
+entry points: constants, body catalogs, equations of motion, integrators and
+the Kepler solver live here and import only NumPy (SciPy is loaded when
+odeint runs).
+Plotting lives in nbody.render, which is not imported by this package.
+"""
+from nbody.equations import nbody_accelerations, nbody_derivatives, total_energy
+from nbody.barnes_hut import Octree, barnes_hut_accelerations, barnes_hut_derivatives
+from nbody.integrators import INTEGRATORS, fixed_step_solve, leapfrog, solve, yoshida4
+from nbody.ensemble import EnsembleSummary, integrate_ensemble, perturbed_ensemble
+from nbody.constants import K1, K2
+from nbody.kepler import calculate_position
+from nbody.catalog import CATALOG_DTYPE, asteroid_belt, load_catalog
+from nbody.scenarios import SCENARIOS, initial_conditions
+
+__all__ = [
+    "CATALOG_DTYPE",
+    "EnsembleSummary",
+    "INTEGRATORS",
+    "K1",
+    "K2",
+    "Octree",
+    "SCENARIOS",
+    "asteroid_belt",
+    "barnes_hut_accelerations",
+    "barnes_hut_derivatives",
+    "calculate_position",
+    "fixed_step_solve",
+    "initial_conditions",
+    "integrate_ensemble",
+    "leapfrog",
+    "load_catalog",
+    "nbody_accelerations",
+    "nbody_derivatives",
+    "perturbed_ensemble",
+    "solve",
+    "total_energy",
+    "yoshida4",
+]
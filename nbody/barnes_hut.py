@@ -0,0 +1,218 @@
+# Barnes-Hut tree gravity: approximate distant groups of bodies by their centre of mass
+
+import numpy as np  # For numerical calculations
+
+# Deepest octree level; bodies closer than size / 2**MAX_DEPTH share a leaf
+MAX_DEPTH = 20
+
+
+class Octree:
+    """
+    Array-backed octree over a set of bodies
+
+    Nodes are stored level by level in flat arrays. Bodies are sorted by
+    Morton key so every node owns a contiguous range of them, and the
+    children of a node are a contiguous range of nodes.
+    """
+
+    def __init__(self, r, masses, leaf_size=8):
+        """
+        Function to build the tree
+        :param r: Positions, shape (N, 3)
+        :param masses: Masses of the bodies, shape (N,)
+        :param leaf_size: Maximum number of bodies in a leaf (above MAX_DEPTH)
+        """
+        r = np.asarray(r, dtype="float64")
+        masses = np.asarray(masses, dtype="float64")
+        n = len(r)
+
+        # Bounding cube of all bodies
+        lo = r.min(axis=0)
+        size = (r.max(axis=0) - lo).max()
+        size = size * (1 + 1e-9) if size > 0 else 1.0
+
+        # Interleave the bits of the quantized coordinates into Morton keys
+        cells = ((r - lo) / size * (1 << MAX_DEPTH)).astype(np.int64)
+        keys = np.zeros(n, dtype=np.int64)
+        for bit in range(MAX_DEPTH):
+            for axis in range(3):
+                keys |= ((cells[:, axis] >> bit) & 1) << (3 * bit + (2 - axis))
+
+        self.order = np.argsort(keys, kind="stable")  # Sorted slot -> body index
+        self.slot = np.empty(n, dtype=np.int64)  # Body index -> sorted slot
+        self.slot[self.order] = np.arange(n)
+        keys = keys[self.order]
+        self.r = r[self.order]
+        self.masses = masses[self.order]
+
+        # Walk down the levels, splitting every node that holds too many bodies
+        starts, ends, sizes, child_start, child_end = [], [], [], [], []
+        level_start = np.array([0])
+        level_end = np.array([n])
+        level = 0
+        n_nodes = 0
+        while level_start.size:
+            n_level = level_start.size
+            leaf = (level_end - level_start <= leaf_size) | (level == MAX_DEPTH)
+
+            # Children of the nodes to split: runs of equal key prefix one level down
+            split = np.flatnonzero(~leaf)
+            counts = level_end[split] - level_start[split]
+            slots = np.repeat(level_start[split], counts) + _ranges(counts)
+            prefix = keys[slots] >> (3 * (MAX_DEPTH - level - 1))
+            new_run = np.ones(slots.size, dtype=bool)
+            new_run[1:] = (prefix[1:] != prefix[:-1]) | (slots[1:] != slots[:-1] + 1)
+            new_run[np.cumsum(counts)[:-1]] = True  # Never merge across parents
+            next_start = slots[new_run]
+            next_end = np.append(next_start[1:], 0)
+            parent_last = np.cumsum(new_run)[np.cumsum(counts) - 1] - 1
+            next_end[parent_last] = level_end[split]
+
+            # Children of split node k occupy a contiguous run of the next level
+            n_children = np.diff(np.append(0, parent_last + 1))
+            first_child = n_nodes + n_level + np.append(0, np.cumsum(n_children)[:-1])
+            cs = np.full(n_level, -1, dtype=np.int64)
+            ce = np.full(n_level, -1, dtype=np.int64)
+            cs[split] = first_child
+            ce[split] = first_child + n_children
+
+            starts.append(level_start)
+            ends.append(level_end)
+            sizes.append(np.full(n_level, size / (1 << level)))
+            child_start.append(cs)
+            child_end.append(ce)
+            n_nodes += n_level
+            level_start, level_end = next_start, next_end
+            level += 1
+
+        self.start = np.concatenate(starts)
+        self.end = np.concatenate(ends)
+        self.size = np.concatenate(sizes)
+        self.child_start = np.concatenate(child_start)
+        self.child_end = np.concatenate(child_end)
+        self.is_leaf = self.child_start < 0
+
+        # Mass and centre of mass of every node from prefix sums over sorted bodies
+        cum_m = np.concatenate(([0.0], np.cumsum(self.masses)))
+        cum_mr = np.vstack((np.zeros(3), np.cumsum(self.masses[:, np.newaxis] * self.r, axis=0)))
+        self.mass = cum_m[self.end] - cum_m[self.start]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            self.com = (cum_mr[self.end] - cum_mr[self.start]) / self.mass[:, np.newaxis]
+        # Massless nodes fall back to their first body so distances stay finite
+        massless = ~(self.mass > 0)
+        self.com[massless] = self.r[self.start[massless]]
+
+    def accelerations(self, K1, theta=0.5, softening=0.0, targets=None):
+        """
+        Function to calculate the gravitational acceleration of bodies from the tree
+        :param K1: Normalized gravitational constant
+        :param theta: Opening angle; a node of side s at distance d is used whole when s < theta * d
+        :param softening: Plummer softening length (0 for pure Newtonian gravity)
+        :param targets: Body indices to evaluate (default: every body)
+        :return: Accelerations, shape (len(targets), 3), in target order
+        """
+        n = len(self.r)
+        targets = np.arange(n) if targets is None else np.asarray(targets)
+        target_slot = self.slot[targets]
+        acc = np.zeros((targets.size, 3))
+        eps2 = softening ** 2
+
+        # Frontier of (target, node) interactions still to be resolved
+        ti = np.arange(targets.size)
+        ni = np.zeros(targets.size, dtype=np.int64)
+        while ti.size:
+            d = self.com[ni] - self.r[target_slot[ti]]
+            dist2 = (d * d).sum(axis=1)
+            inside = (self.start[ni] <= target_slot[ti]) & (target_slot[ti] < self.end[ni])
+            far = ~inside & (self.size[ni] ** 2 < theta ** 2 * dist2)
+
+            # Far nodes act as a single point mass at their centre of mass
+            _accumulate(acc, ti[far], K1 * self.mass[ni[far]], d[far], dist2[far] + eps2)
+
+            # Near leaves are summed body by body, skipping the target itself
+            near_leaf = ~far & self.is_leaf[ni]
+            lt, ln = ti[near_leaf], ni[near_leaf]
+            counts = self.end[ln] - self.start[ln]
+            pt = np.repeat(lt, counts)
+            ps = np.repeat(self.start[ln], counts) + _ranges(counts)
+            keep = ps != target_slot[pt]
+            pt, ps = pt[keep], ps[keep]
+            dp = self.r[ps] - self.r[target_slot[pt]]
+            _accumulate(acc, pt, K1 * self.masses[ps], dp, (dp * dp).sum(axis=1) + eps2)
+
+            # Near internal nodes are opened: replace them by their children
+            opened = ~far & ~self.is_leaf[ni]
+            ot, on = ti[opened], ni[opened]
+            counts = self.child_end[on] - self.child_start[on]
+            ti = np.repeat(ot, counts)
+            ni = np.repeat(self.child_start[on], counts) + _ranges(counts)
+
+        return acc
+
+
+def _ranges(counts):
+    """
+    Function to build the concatenation of arange(c) for every c in counts
+    :param counts: Non-negative integer array
+    :return: Integer array of length counts.sum()
+    """
+    total = counts.sum()
+    offsets = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.arange(total) - offsets
+
+
+def _accumulate(acc, rows, gm, d, dist2):
+    """
+    Function to add point-mass accelerations gm * d / |d|**3 into acc[rows]
+    :param acc: Accumulator, shape (T, 3), updated in place
+    :param rows: Target row for each interaction
+    :param gm: K1 times the source mass for each interaction
+    :param d: Separation source - target for each interaction
+    :param dist2: Squared (softened) distance for each interaction
+    """
+    if rows.size == 0:
+        return
+    scale = gm / (dist2 * np.sqrt(dist2))
+    for axis in range(3):
+        acc[:, axis] += np.bincount(rows, weights=scale * d[:, axis], minlength=len(acc))
+
+
+def barnes_hut_accelerations(r, masses, K1, theta=0.5, softening=0.0, leaf_size=8):
+    """
+    Function to calculate the gravitational acceleration of every body with a Barnes-Hut tree
+    :param r: Positions, shape (N, 3)
+    :param masses: Masses of the bodies, shape (N,)
+    :param K1: Normalized gravitational constant
+    :param theta: Opening angle (0 reproduces the direct sum)
+    :param softening: Plummer softening length
+    :param leaf_size: Maximum number of bodies in a leaf
+    :return: Accelerations, shape (N, 3)
+    """
+    tree = Octree(r, masses, leaf_size=leaf_size)  # Rebuilt every call: bodies move
+    return tree.accelerations(K1, theta=theta, softening=softening)
+
+
+def barnes_hut_derivatives(w, t, masses, K1, K2, v_com=None, theta=0.5, softening=0.0):
+    """
+    Function to calculate the derivatives of the state variables with a Barnes-Hut tree
+    Drop-in replacement for nbody.equations.nbody_derivatives in scipy.integrate.odeint.
+    :param w: State variables [r1, ..., rN, v1, ..., vN], flat or shape (2, N, 3)
+    :param t: Time (unused, required by scipy.integrate.odeint)
+    :param masses: Masses of the N bodies
+    :param K1: Normalized gravitational constant
+    :param K2: Normalized velocity-to-position constant
+    :param v_com: Optional centre-of-mass velocity subtracted from dr/dt
+    :param theta: Opening angle
+    :param softening: Plummer softening length
+    :return: Derivatives of the state variables, flat array of length 6N
+    """
+    n = np.size(masses)
+    state = np.reshape(w, (2, n, 3))  # Positions in state[0], velocities in state[1]
+
+    derivs = np.empty((2, n, 3))
+    np.multiply(K2, state[1], out=derivs[0])  # Changes in position
+    if v_com is not None:
+        derivs[0] -= v_com  # Adjust for center of mass motion
+    derivs[1] = barnes_hut_accelerations(state[0], masses, K1, theta=theta, softening=softening)
+
+    return derivs.reshape(-1)
@@ -0,0 +1,168 @@
+# Trajectory cache: integrated solutions stored on disk, keyed by everything that determines them
+#
+# A script that only changes how its orbits are drawn reuses the solution of
+# its previous run instead of integrating again. Entries are plain .npy files
+# memory-mapped on a hit; the least recently used ones are removed once the
+# cache outgrows its size limit.
+#
+#   python -m nbody.cache info     (entries, size, limit)
+#   python -m nbody.cache clear    (remove every entry)
+
+import hashlib
+import os
+
+import numpy as np  # For numerical calculations
+
+from nbody.equations import EQUATIONS_VERSION
+
+# Default cache directory and size limit
+TRAJECTORY_CACHE = ".trajectory_cache"
+TRAJECTORY_CACHE_BYTES = 512 * 2 ** 20
+
+
+def trajectory_key(init_params, time_span, masses, K1, K2, v_com=None, integrator="odeint", gravity_solver="direct",
+                   theta=0.5, substeps=16, jacobian=True):
+    """
+    Function to hash the inputs of a run (arguments of nbody.integrators.solve)
+    :return: Hexadecimal digest; settings the run does not use (theta without Barnes-Hut, substeps with odeint,
+             jacobian without odeint and the direct solver) are left out
+    """
+    settings = [f"equations {EQUATIONS_VERSION}", integrator, gravity_solver]
+    if gravity_solver == "barnes-hut":
+        settings.append(repr(float(theta)))
+    if integrator != "odeint":
+        settings.append(str(int(substeps)))
+    elif gravity_solver == "direct" and jacobian:
+        settings.append("jacobian")
+    digest = hashlib.sha256("|".join(settings).encode())
+    for values in (init_params, time_span, masses, K1, K2, () if v_com is None else v_com):
+        array = np.ascontiguousarray(values, dtype="<f8")
+        digest.update(f"|{array.shape}|".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()[:32]
+
+
+class TrajectoryCache:
+    """
+    Directory of solutions, one uncompressed .npy file per key
+
+    load() memory-maps an entry (read-only) and marks it as used by touching
+    its modification time; store() writes atomically, then removes the least
+    recently used entries until the directory fits max_bytes. hits / misses
+    count the lookups of this instance.
+    """
+
+    def __init__(self, directory=TRAJECTORY_CACHE, max_bytes=TRAJECTORY_CACHE_BYTES):
+        """
+        Function to open a cache directory (created on the first store)
+        :param directory: Cache directory
+        :param max_bytes: Size limit of the entries
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, key):
+        """
+        Function to find the file of an entry
+        :return: Path of the .npy file
+        """
+        return os.path.join(self.directory, f"trajectory_{key}.npy")
+
+    def entries(self):
+        """
+        Function to list the entries
+        :return: List of (path, size in bytes, last use), least recently used first
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.startswith("trajectory_") and name.endswith(".npy"):
+                stat = os.stat(os.path.join(self.directory, name))
+                entries.append((os.path.join(self.directory, name), stat.st_size, stat.st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def load(self, key):
+        """
+        Function to look up a solution
+        :param key: Key from trajectory_key
+        :return: Read-only memory-mapped array, or None on a miss
+        """
+        path = self.path(key)
+        try:
+            solution = np.load(path, mmap_mode="r")
+            os.utime(path)  # Most recently used
+        except (OSError, ValueError):  # Missing, or cut short by a crash
+            self.misses += 1
+            return None
+        self.hits += 1
+        return solution
+
+    def store(self, key, solution):
+        """
+        Function to add a solution, then evict the least recently used entries beyond the size limit
+        :param key: Key from trajectory_key
+        :param solution: Array to store (larger than max_bytes: not stored)
+        """
+        solution = np.asarray(solution)
+        if solution.nbytes > self.max_bytes:
+            return
+        path = self.path(key)
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, solution)
+        os.replace(tmp_path, path)  # Atomic: readers never see a partial file
+        self.evict()
+
+    def evict(self):
+        """
+        Function to remove the least recently used entries until the cache fits max_bytes
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries[:-1]:  # The newest entry always stays
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:  # Still mapped by a reader on some platforms: try again next time
+                continue
+            total -= size
+
+    def clear(self):
+        """
+        Function to remove every entry
+        :return: Number of entries removed
+        """
+        removed = 0
+        for path, _, _ in self.entries():
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+        return removed
+
+
+def main():
+    import argparse  # Only for the command line: importing the package stays cheap
+    parser = argparse.ArgumentParser(description="Inspect or clear the trajectory cache")
+    parser.add_argument("command", choices=["info", "clear"])
+    parser.add_argument("--directory", default=TRAJECTORY_CACHE)
+    args = parser.parse_args()
+
+    cache = TrajectoryCache(args.directory)
+    if args.command == "clear":
+        print(f"Removed {cache.clear()} trajectories from {args.directory}")
+        return
+    entries = cache.entries()
+    total = sum(size for _, size, _ in entries)
+    print(f"{len(entries)} trajectories in {args.directory}: {total / 2 ** 20:.1f} MiB "
+          f"of {cache.max_bytes / 2 ** 20:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+# Body catalogs: orbital elements of many bodies as columns of one structured array
+
+import os
+
+import numpy as np  # For numerical calculations
+
+from nbody.constants import DAY, G_solar, M_sun
+
+# One row per body: name, semi-major axis (meters), eccentricity, orbital period (days), colour
+CATALOG_DTYPE = np.dtype([("name", "U32"), ("a", "f8"), ("e", "f8"), ("period", "f8"), ("color", "U32")])
+
+# Catalog of the eight planets shipped with the package
+SOLAR_SYSTEM = os.path.join(os.path.dirname(__file__), "data", "solar_system.csv")
+
+
+def load_catalog(path=SOLAR_SYSTEM):
+    """
+    Function to read a catalog from a CSV file with a header row naming the columns of CATALOG_DTYPE
+    :param path: CSV file (extra columns are ignored, the order of the columns does not matter)
+    :return: Structured array of dtype CATALOG_DTYPE, one row per body
+    """
+    catalog = np.genfromtxt(path, delimiter=",", names=True, dtype=CATALOG_DTYPE, encoding="utf-8",
+                            usecols=CATALOG_DTYPE.names)
+    return np.atleast_1d(catalog)
+
+
+def asteroid_belt(count, a_min=3.2e11, a_max=4.9e11, e_max=0.3, color="gray", seed=None):
+    """
+    Function to generate a catalog of asteroids on random orbits
+    :param count: Number of asteroids
+    :param a_min: Smallest semi-major axis (meters)
+    :param a_max: Largest semi-major axis (meters)
+    :param e_max: Largest eccentricity
+    :param color: Colour of every asteroid
+    :param seed: Seed of the random generator
+    :return: Structured array of dtype CATALOG_DTYPE
+    """
+    rng = np.random.default_rng(seed)
+    catalog = np.zeros(count, dtype=CATALOG_DTYPE)
+    catalog["name"] = [f"Asteroid {k + 1}" for k in range(count)]
+    catalog["a"] = rng.uniform(a_min, a_max, count)
+    catalog["e"] = rng.uniform(0, e_max, count)
+    catalog["period"] = 2 * np.pi * np.sqrt(catalog["a"] ** 3 / (G_solar * M_sun)) / DAY  # Kepler's third law
+    catalog["color"] = color
+    return catalog
@@ -0,0 +1,155 @@
+# Checkpoints: the full state of a long run saved as it goes, so an interrupted run can resume
+#
+# A checkpoint is one uncompressed .npz file: the state, the time and output row
+# reached, the integrator's own memory (see nbody.stream.ChunkSolver.snapshot),
+# a key identifying the run and, for ensembles, the state of the random
+# generator. Files are replaced atomically, so a run stopped mid-write leaves the
+# previous checkpoint intact. Writing happens on a background thread: the
+# integration only copies a few arrays and carries on.
+
+import json
+import os
+import queue
+import threading
+import time
+
+import numpy as np  # For numerical calculations
+
+# Default wall time between two checkpoints, in seconds
+CHECKPOINT_SECONDS = 300.0
+
+
+def write_checkpoint(path, arrays):
+    """
+    Function to write a checkpoint atomically
+    :param path: Checkpoint file (.npz)
+    :param arrays: Dictionary of arrays (or values NumPy turns into arrays)
+    """
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())  # On the disk before it replaces the previous checkpoint
+    os.replace(tmp_path, path)
+
+
+def read_checkpoint(path, rng=None):
+    """
+    Function to read a checkpoint
+    :param path: Checkpoint file written by write_checkpoint or a Checkpointer
+    :param rng: numpy Generator set to the random state saved with the checkpoint, if any
+    :return: Dictionary of arrays
+    """
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+    if rng is not None and "rng" in arrays:
+        rng.bit_generator.state = json.loads(str(arrays["rng"]))
+    return arrays
+
+
+class Checkpointer:
+    """
+    Periodic checkpoints of a run, written on a background thread
+
+    The loop of a run asks due(t) after each piece of work and hands a
+    snapshot to save() when it is; save() returns at once. If the writer is
+    still busy with an earlier checkpoint, the snapshot waiting for it is
+    replaced by the newer one rather than waited for (the replaced ones are
+    counted in skipped), so the file lags by at most one write. Use as a
+    context manager, or call close() to wait for the last write.
+    """
+
+    def __init__(self, path, seconds=CHECKPOINT_SECONDS, sim_time=None, rng=None):
+        """
+        Function to set up checkpoints of a run
+        :param path: Checkpoint file (.npz)
+        :param seconds: Wall time between two checkpoints (None: not by wall time)
+        :param sim_time: Simulated time between two checkpoints (None: not by simulated time)
+        :param rng: numpy Generator whose state goes into every checkpoint (e.g. the one drawing an ensemble)
+        """
+        self.path = path
+        self.seconds = seconds
+        self.sim_time = sim_time
+        self.rng = rng
+        self.written = 0
+        self.skipped = 0
+        self._last_wall = time.monotonic()
+        self._last_t = None
+        self._pending = queue.Queue(maxsize=1)
+        self._thread = None
+        self._error = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def load(self):
+        """
+        Function to read the last checkpoint, to resume the run
+        :return: Dictionary of arrays (rng, if any, is set to the saved random state)
+        """
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"No checkpoint to resume from at {self.path}: start the run without resuming")
+        return read_checkpoint(self.path, self.rng)
+
+    def due(self, t):
+        """
+        Function to decide whether a checkpoint is due
+        :param t: Simulated time reached
+        :return: True once seconds of wall time or sim_time of simulated time have passed since the last one
+        """
+        if self._last_t is None:
+            self._last_t = t
+        if self.seconds is not None and time.monotonic() - self._last_wall >= self.seconds:
+            return True
+        return self.sim_time is not None and abs(t - self._last_t) >= self.sim_time
+
+    def save(self, snapshot, t, before=None):
+        """
+        Function to hand a snapshot to the writer thread
+        :param snapshot: Dictionary of arrays, no longer modified by the caller
+        :param t: Simulated time of the snapshot
+        :param before: Optional function the writer thread calls first (e.g. syncing the output file)
+        """
+        if self._error is not None:
+            raise self._error
+        if self.rng is not None:
+            snapshot = dict(snapshot, rng=json.dumps(self.rng.bit_generator.state))
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write, daemon=True)
+            self._thread.start()
+        try:
+            self._pending.get_nowait()  # The writer is behind: the newest snapshot takes the place of the stale one
+            self.skipped += 1
+        except queue.Empty:
+            pass
+        self._pending.put_nowait((snapshot, before))  # Only this thread puts, so the slot is free
+        self._last_wall = time.monotonic()
+        self._last_t = t
+
+    def _write(self):
+        """
+        Function run by the writer thread: write the snapshots handed over until close()
+        """
+        while (item := self._pending.get()) is not None:
+            snapshot, before = item
+            try:
+                if before is not None:
+                    before()
+                write_checkpoint(self.path, snapshot)
+                self.written += 1
+            except Exception as exc:  # Raised in the loop by the next save, or by close
+                self._error = exc
+
+    def close(self):
+        """
+        Function to wait for the checkpoint being written, if any
+        """
+        if self._thread is not None:
+            self._pending.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            raise self._error
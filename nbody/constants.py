@@ -0,0 +1,21 @@
+# Constants shared by the simulations
+
+# Define the universal gravitation constant
+G = 6.67408e-11  # N-m2/kg2
+
+# Constants related to the Alpha Centauri system
+# Reference quantities
+m_nd = 1.989e+30  # kg - mass of the sun
+r_nd = 5.326e+12  # m - distance between stars in Alpha Centauri
+v_nd = 30000  # m/s - relative velocity of earth around the sun
+t_nd = 79.91 * 365 * 24 * 3600 * 0.51  # s - orbital period of Alpha Centauri
+
+# Normalized constants
+K1 = G * t_nd * m_nd / (r_nd ** 2 * v_nd)
+K2 = v_nd * t_nd / r_nd
+
+# Solar system (the planets themselves are listed in nbody/data/solar_system.csv)
+G_solar = 6.674e-11  # Gravitational constant
+M_sun = 1.989e30  # Mass of the Sun
+DAY = 24 * 3600  # s
+
@@ -0,0 +1,119 @@
+# Ensemble integration: many perturbed copies of one system advanced together
+
+from collections import namedtuple
+
+import numpy as np  # For numerical calculations
+
+from nbody.equations import nbody_accelerations
+from nbody.integrators import STEPS
+
+# Per-member summary of an ensemble run (leading axis M everywhere)
+EnsembleSummary = namedtuple("EnsembleSummary", ["r", "v", "min_distance", "escaped"])
+
+
+def perturbed_ensemble(r, v, members, scale=1e-3, seed=None):
+    """
+    Function to stack randomly perturbed copies of one set of initial conditions
+    :param r: Positions, shape (N, 3)
+    :param v: Velocities, shape (N, 3)
+    :param members: Number of copies M (member 0 is left unperturbed)
+    :param scale: Standard deviation of the Gaussian perturbation of every component
+    :param seed: Seed or numpy Generator for the perturbations
+    :return: Tuple (r, v) of arrays with shape (M, N, 3)
+    """
+    rng = np.random.default_rng(seed)
+    r = np.broadcast_to(np.asarray(r, dtype="float64"), (members,) + np.shape(r)).copy()
+    v = np.broadcast_to(np.asarray(v, dtype="float64"), (members,) + np.shape(v)).copy()
+    r[1:] += rng.normal(scale=scale, size=r[1:].shape)
+    v[1:] += rng.normal(scale=scale, size=v[1:].shape)
+    return r, v
+
+
+def pair_distances(r):
+    """
+    Function to calculate the distance of every pair of bodies
+    :param r: Positions, shape (..., N, 3)
+    :return: Distances, shape (..., N * (N - 1) / 2)
+    """
+    i, j = np.triu_indices(r.shape[-2], k=1)
+    d = r[..., j, :] - r[..., i, :]
+    return np.sqrt((d * d).sum(axis=-1))
+
+
+def escaped_bodies(r, v, masses, K1, K2, escape_radius):
+    """
+    Function to flag bodies that are far from the centre of mass and energetically unbound
+    :param r: Positions, shape (..., N, 3)
+    :param v: Velocities, shape (..., N, 3)
+    :param masses: Masses of the N bodies
+    :param K1: Normalized gravitational constant
+    :param K2: Normalized velocity-to-position constant
+    :param escape_radius: Distance from the centre of mass beyond which a body may count as escaped
+    :return: Boolean array, shape (..., N)
+    """
+    masses = np.asarray(masses, dtype="float64")
+    weights = masses[:, np.newaxis] / masses.sum()
+    r_com = (weights * r).sum(axis=-2, keepdims=True)
+    v_com = (weights * v).sum(axis=-2, keepdims=True)
+    far = np.linalg.norm(r - r_com, axis=-1) > escape_radius
+
+    # Specific energy of each body: kinetic relative to the centre of mass plus potential of the others
+    d = r[..., np.newaxis, :, :] - r[..., :, np.newaxis, :]
+    dist = np.sqrt((d * d).sum(axis=-1))
+    n = r.shape[-2]
+    dist[..., np.arange(n), np.arange(n)] = np.inf
+    potential = -K1 * (masses / dist).sum(axis=-1)
+    kinetic = 0.5 * K2 * ((v - v_com) ** 2).sum(axis=-1)
+    return far & (kinetic + potential > 0)
+
+
+def integrate_ensemble(r, v, masses, K1, K2, dt, steps, v_com=None, method="yoshida4",
+                       escape_radius=10.0, accelerations=nbody_accelerations, checkpoint=None, resume=False):
+    """
+    Function to advance M copies of a system together and summarize each one
+    :param r: Positions, shape (M, N, 3) (not modified)
+    :param v: Velocities, shape (M, N, 3) (not modified)
+    :param masses: Masses of the N bodies, shared by all members
+    :param K1: Normalized gravitational constant
+    :param K2: Normalized velocity-to-position constant
+    :param dt: Time step
+    :param steps: Number of time steps
+    :param v_com: Optional centre-of-mass velocity subtracted from dr/dt, shape (M, 1, 3) or (3,)
+    :param method: "leapfrog" or "yoshida4"
+    :param escape_radius: Distance from the centre of mass used by the escape test
+    :param accelerations: Force kernel accepting positions of shape (M, N, 3)
+    :param checkpoint: nbody.checkpoint.Checkpointer saving the state of the run between steps, or None
+                       (give it the Generator behind perturbed_ensemble to save the random state too)
+    :param resume: Continue the run from checkpoint.path (r and v give only the shape then)
+    :return: EnsembleSummary with the final r and v, the closest approach of any pair, and an escape flag
+    """
+    if resume and checkpoint is None:
+        raise ValueError("resume needs a checkpoint")
+    r = np.array(r, dtype="float64")
+    v = np.array(v, dtype="float64")
+    step = STEPS[method]
+
+    min_distance = pair_distances(r).min(axis=-1)
+    a = None
+    first = 0
+    if resume:
+        snapshot = checkpoint.load()
+        if snapshot["r"].shape != r.shape:
+            raise ValueError(f"{checkpoint.path} is the checkpoint of an ensemble of another shape")
+        first = int(snapshot["step"])
+        r[:], v[:], min_distance[:] = snapshot["r"], snapshot["v"], snapshot["min_distance"]
+        a = np.array(snapshot["a"]) if "a" in snapshot else None
+
+    for k in range(first, steps):
+        a = step(r, v, a, masses, K1, K2, dt, v_com, accelerations)
+        np.minimum(min_distance, pair_distances(r).min(axis=-1), out=min_distance)
+        if checkpoint is not None and checkpoint.due((k + 1) * dt):
+            snapshot = dict(step=k + 1, r=r.copy(), v=v.copy(), min_distance=min_distance.copy())
+            if a is not None:
+                snapshot["a"] = a.copy()
+            checkpoint.save(snapshot, (k + 1) * dt)
+    if checkpoint is not None:
+        checkpoint.close()
+
+    escaped = escaped_bodies(r, v, masses, K1, K2, escape_radius).any(axis=-1)
+    return EnsembleSummary(r, v, min_distance, escaped)
@@ -0,0 +1,105 @@
+# Ephemeris tables: planet positions over one period, precomputed and cached on disk
+
+import hashlib
+import os
+
+import numpy as np  # For numerical calculations
+
+from nbody.kepler import solve_kepler
+
+# Default number of table entries per orbit and default cache directory
+EPHEMERIS_RESOLUTION = 1024
+EPHEMERIS_CACHE = ".ephemeris_cache"
+
+
+def build_table(e, resolution=EPHEMERIS_RESOLUTION):
+    """
+    Function to tabulate the orbits of many bodies at evenly spaced phases
+    :param e: Eccentricities, shape (bodies,)
+    :param resolution: Number of table entries per orbit
+    :return: Array of shape (bodies, resolution, 2, 3): position and its derivative with respect to phase,
+             for a semi-major axis of 1 (positions scale with a, and the period only sets the phase)
+    """
+    e = np.asarray(e, dtype="float64")[:, np.newaxis]
+    M = 2 * np.pi * np.arange(resolution) / resolution  # Mean anomaly of each entry
+    E = solve_kepler(M, e)
+    dE_dphase = 2 * np.pi / (1 - e * np.cos(E))  # From E - e sin(E) = 2 pi phase
+
+    table = np.zeros(E.shape + (2, 3))
+    table[..., 0, 0] = np.cos(E) - e
+    table[..., 0, 2] = np.sqrt(1 - e ** 2) * np.sin(E)
+    table[..., 1, 0] = -np.sin(E) * dE_dphase
+    table[..., 1, 2] = np.sqrt(1 - e ** 2) * np.cos(E) * dE_dphase
+    return table
+
+
+def table_path(e, resolution, cache_dir=EPHEMERIS_CACHE):
+    """
+    Function to find the cache file of a table, keyed by the eccentricities and the resolution
+    :return: Path of the .npy file
+    """
+    key = np.ascontiguousarray(e, dtype="<f8").tobytes() + f"|{int(resolution)}".encode()
+    digest = hashlib.sha256(key).hexdigest()[:20]
+    return os.path.join(cache_dir, f"ephemeris_{digest}.npy")
+
+
+def load_table(e, resolution=EPHEMERIS_RESOLUTION, cache_dir=EPHEMERIS_CACHE):
+    """
+    Function to load a table from the disk cache, building and storing it on a miss
+    :param e: Eccentricities, shape (bodies,)
+    :param resolution: Number of table entries per orbit
+    :param cache_dir: Cache directory (None disables the cache)
+    :return: Array of shape (bodies, resolution, 2, 3), see build_table
+    """
+    if cache_dir is None:
+        return build_table(e, resolution)
+
+    path = table_path(e, resolution, cache_dir)
+    if os.path.exists(path):
+        return np.load(path)
+
+    table = build_table(e, resolution)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.save(f, table)
+    os.replace(tmp_path, path)  # Atomic: readers never see a partial file
+    return table
+
+
+def interpolate(table, phase, a=1.0):
+    """
+    Function to look positions up by orbital phase with cubic Hermite interpolation
+    :param table: Array of shape (bodies, resolution, 2, 3), see build_table
+    :param phase: Orbital phase (fraction of a period) of every body, shape (..., bodies); wraps around
+    :param a: Semi-major axes (meters), shape (bodies,)
+    :return: Positions, shape phase.shape + (3,)
+    """
+    resolution = table.shape[1]
+    u = np.mod(np.asarray(phase, dtype="float64"), 1.0) * resolution
+    k = np.floor(u).astype(np.int64) % resolution
+    s = (u - np.floor(u))[..., np.newaxis]
+    k_next = (k + 1) % resolution
+    body = np.arange(len(table))
+
+    p0, p1 = table[body, k, 0], table[body, k_next, 0]
+    m0, m1 = table[body, k, 1] / resolution, table[body, k_next, 1] / resolution  # Derivatives per table step
+
+    s2 = s * s
+    s3 = s2 * s
+    positions = ((2 * s3 - 3 * s2 + 1) * p0 + (s3 - 2 * s2 + s) * m0
+                 + (-2 * s3 + 3 * s2) * p1 + (s3 - s2) * m1)
+    return positions * np.asarray(a, dtype="float64")[:, np.newaxis]
+
+
+def ephemeris_positions(phase, a, e, resolution=EPHEMERIS_RESOLUTION, cache_dir=EPHEMERIS_CACHE):
+    """
+    Function to look up the positions of many bodies at many phases
+    :param phase: Orbital phases, shape (frames, bodies)
+    :param a: Semi-major axes (meters), shape (bodies,)
+    :param e: Eccentricities, shape (bodies,)
+    :param resolution: Number of table entries per orbit
+    :param cache_dir: Cache directory (None disables the cache)
+    :return: Positions, shape (frames, bodies, 3)
+    """
+    return interpolate(load_table(e, resolution=resolution, cache_dir=cache_dir), phase, a)
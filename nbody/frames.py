@@ -0,0 +1,214 @@
+# Frame production: drawing an animation scene frame by frame, in this process or across worker processes
+#
+# A scene is a module-level function scene(fig, *args) that draws the static
+# parts of an animation onto fig and returns (animate, init), where animate(i)
+# moves the artists to frame i and returns the artists it changed. Because a
+# scene is rebuilt from picklable arguments, every worker process draws its own
+# copy on an off-screen Agg figure.
+
+import multiprocessing
+import os
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np  # For numerical calculations
+
+from nbody.sinks import to_palette
+
+# State of a worker process: its figure, its animate function and the next frame it can draw without replaying
+_worker = {}
+
+
+def agg_figure(figsize, dpi):
+    """
+    Function to create an off-screen figure (no pyplot, no GUI backend)
+    :param figsize: Figure size in inches
+    :param dpi: Resolution of the frames
+    :return: Figure with an Agg canvas
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from mpl_toolkits.mplot3d import Axes3D  # noqa: F401  (registers the 3D projection)
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    return fig
+
+
+def grab_frame(fig):
+    """
+    Function to draw a figure
+    :param fig: Figure with an Agg canvas
+    :return: RGBA view of the canvas, shape (height, width, 4); only valid until the next draw
+    """
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())
+
+
+def axes_limits(fig):
+    """
+    Function to read the view of every axes of a figure
+    :param fig: Figure
+    :return: Tuple of the limits (and 3D camera angles) of each axes
+    """
+    view = []
+    for ax in fig.axes:
+        if hasattr(ax, "get_w_lims"):  # 3D axes
+            view.append(tuple(ax.get_w_lims()) + (ax.elev, ax.azim, ax.roll))
+        else:
+            view.append(tuple(ax.viewLim.bounds))
+    return tuple(view)
+
+
+def depth_order(artists):
+    """
+    Function to order moving artists as a full draw would, 3D collections sorted by depth (farthest first)
+    :param artists: Artists to draw
+    :return: List of the artists in drawing order
+    """
+    from matplotlib.collections import Collection
+    collections = [artist for artist in artists if isinstance(artist, Collection) and hasattr(artist, "do_3d_projection")]
+    if collections and getattr(collections[0].axes, "computed_zorder", False):
+        # Same as Axes3D.draw: the collections swap the z-orders they hold by projected depth
+        zorders = sorted(artist.zorder for artist in collections)
+        for zorder, artist in zip(zorders, sorted(collections, key=lambda artist: artist.do_3d_projection(),
+                                                  reverse=True)):
+            artist.zorder = zorder
+    else:
+        for artist in collections:
+            artist.do_3d_projection()
+    return sorted(artists, key=lambda artist: artist.get_zorder())
+
+
+class Blitter:
+    """
+    Frame grabber drawing only the artists an animation moves
+
+    The figure is drawn whole once without the moving artists (background,
+    panes, ticks, labels, legend) and that raster is cached. Every frame then
+    restores the cache and draws just the moving artists on top, which is what
+    FuncAnimation(blit=True) does on screen. Legends are drawn over the moving
+    artists as in a full draw. The cache is redrawn whenever the limits of an
+    axes change, so scenes that pan their axes stay correct.
+    """
+
+    def __init__(self, fig):
+        """
+        Function to set up blitting on a figure
+        :param fig: Figure with an Agg canvas
+        """
+        self.fig = fig
+        self.redraws = 0  # Times the background was drawn
+        self._legends = [ax.get_legend() for ax in fig.axes if ax.get_legend() is not None] + fig.legends
+        self._background = None
+        self._limits = None
+
+    def grab(self, artists):
+        """
+        Function to draw a frame
+        :param artists: Artists moved since the last frame (what animate(i) returns)
+        :return: RGBA view of the canvas, shape (height, width, 4); only valid until the next draw
+        """
+        canvas = self.fig.canvas
+        artists = list(artists) + self._legends
+        limits = axes_limits(self.fig)
+        if self._background is None or limits != self._limits or not all(a.get_animated() for a in artists):
+            for artist in artists:
+                artist.set_animated(True)  # Left out of full draws
+            canvas.draw()
+            self._background = canvas.copy_from_bbox(self.fig.bbox)
+            self._limits = limits
+            self.redraws += 1
+        else:
+            canvas.restore_region(self._background)
+        for artist in depth_order(artists):
+            self.fig.draw_artist(artist)
+        return np.asarray(canvas.buffer_rgba())
+
+
+def frame_grabber(fig, blit=False):
+    """
+    Function to pick how the frames of a figure are drawn
+    :param fig: Figure with an Agg canvas
+    :param blit: Draw only the moving artists over a cached background (see Blitter)
+    :return: Function grab(artists) returning the RGBA view of the drawn frame
+    """
+    return Blitter(fig).grab if blit else lambda artists: grab_frame(fig)
+
+
+def _init_worker(scene, args, figsize, dpi, prepare, blit):
+    """
+    Function to build the scene once in every worker process
+    """
+    fig = agg_figure(figsize, dpi)
+    animate, _ = scene(fig, *args)
+    _worker.update(grab=frame_grabber(fig, blit), animate=animate, prepare=prepare, next_frame=0)
+
+
+def _draw_chunk(indices):
+    """
+    Function to draw the frames with the given (increasing) indices in a worker process
+    :return: List of frames converted by the sink's prepare function
+    """
+    grab, animate, prepare = _worker["grab"], _worker["animate"], _worker["prepare"]
+    start, stop = indices[0], indices[-1] + 1
+
+    # Scenes keep state between frames (the trails): replay the frames before this chunk without drawing them
+    for i in range(0 if start < _worker["next_frame"] else _worker["next_frame"], start):
+        animate(i)
+
+    images = []
+    drawn = set(indices)
+    for i in range(start, stop):
+        artists = animate(i)
+        if i in drawn:
+            images.append(prepare(grab(artists)))  # e.g. GIF quantization, done here in parallel rather than by the sink
+    _worker["next_frame"] = stop
+    return images
+
+
+def render_frames(scene, args, frames, figsize, dpi, workers=1, chunksize=None, prepare=to_palette, draw=None,
+                  blit=False):
+    """
+    Function to draw the frames of a scene, in order
+    :param scene: Module-level function scene(fig, *args) returning (animate, init)
+    :param args: Picklable arguments of the scene
+    :param frames: Number of frames
+    :param figsize: Figure size in inches
+    :param dpi: Resolution of the frames
+    :param workers: Worker processes (1 draws in this process, None uses one per CPU); needs the fork start
+                    method, without it (e.g. on Windows) the frames are drawn here with a RuntimeWarning
+    :param chunksize: Drawn frames per worker task (default: about four tasks per worker)
+    :param prepare: Picklable function converting a worker's RGBA frames for the sink (the sink's prepare)
+    :param draw: Increasing indices of the frames to draw (default: all); every frame is still animated,
+                 so scenes that keep state between frames stay correct
+    :param blit: Draw only the artists animate(i) returns over a cached background (see Blitter)
+    :return: Generator of frames for a sink: RGBA views of the canvas when drawn in this process,
+             frames converted by prepare when drawn by workers
+    """
+    workers = workers or os.cpu_count()
+    if workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        # Spawned workers would re-run the calling script, whose body is not guarded by __name__ == "__main__"
+        warnings.warn("Drawing frames in worker processes needs the fork start method, missing on this platform: "
+                      "drawing them in this process instead", RuntimeWarning, stacklevel=2)
+        workers = 1
+    draw = range(frames) if draw is None else [int(i) for i in draw]
+    if workers == 1:
+        fig = agg_figure(figsize, dpi)
+        animate, _ = scene(fig, *args)
+        grab = frame_grabber(fig, blit)
+        i = 0
+        for index in draw:
+            while i <= index:
+                artists = animate(i)
+                i += 1
+            yield grab(artists)
+        return
+
+    chunksize = chunksize or max(1, -(-len(draw) // (4 * workers)))
+    chunks = [draw[start:start + chunksize] for start in range(0, len(draw), chunksize)]
+
+    # Forked workers inherit the trajectories instead of re-running the calling script
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork"),
+                             initializer=_init_worker, initargs=(scene, args, figsize, dpi, prepare, blit)) as pool:
+        for images in pool.map(_draw_chunk, chunks):
+            yield from images
@@ -0,0 +1,193 @@
+# Integrators: fixed-step symplectic schemes working in place, plus one entry point for odeint
+
+from functools import partial  # For fixing the Barnes-Hut opening angle
+
+import numpy as np  # For numerical calculations
+
+from nbody.barnes_hut import barnes_hut_accelerations, barnes_hut_derivatives
+from nbody.equations import nbody_accelerations, nbody_derivatives, nbody_jacobian
+
+# Yoshida (1990) coefficients for a 4th-order composition of leapfrog steps
+_CBRT2 = 2 ** (1 / 3)
+_W1 = 1 / (2 - _CBRT2)
+_W0 = -_CBRT2 / (2 - _CBRT2)
+YOSHIDA_DRIFT = (_W1 / 2, (_W0 + _W1) / 2, (_W0 + _W1) / 2, _W1 / 2)
+YOSHIDA_KICK = (_W1, _W0, _W1)
+
+
+def _drift(r, v, K2, v_com, h):
+    """
+    Function to move the positions in place: r += h * (K2 * v - v_com)
+    """
+    r += (h * K2) * v
+    if v_com is not None:
+        r -= h * v_com  # Adjust for center of mass motion
+
+
+def leapfrog_step(r, v, a, masses, K1, K2, dt, v_com=None, accelerations=nbody_accelerations):
+    """
+    Function to take one kick-drift-kick leapfrog step in place (one force call)
+    :param r: Positions, shape (..., N, 3), advanced in place
+    :param v: Velocities, shape (..., N, 3), advanced in place
+    :param a: Accelerations at r from the previous step, or None to compute them
+    :param masses: Masses of the N bodies
+    :param K1: Normalized gravitational constant
+    :param K2: Normalized velocity-to-position constant
+    :param dt: Time step
+    :param v_com: Optional centre-of-mass velocity subtracted from dr/dt
+    :param accelerations: Force kernel with the signature of nbody_accelerations
+    :return: Accelerations at the new positions, to pass to the next step
+    """
+    if a is None:
+        a = accelerations(r, masses, K1)
+    half = 0.5 * dt
+    v += half * a  # Kick
+    _drift(r, v, K2, v_com, dt)  # Drift
+    a = accelerations(r, masses, K1)
+    v += half * a  # Kick
+    return a
+
+
+def yoshida4_step(r, v, a, masses, K1, K2, dt, v_com=None, accelerations=nbody_accelerations):
+    """
+    Function to take one step of Yoshida's 4th-order symplectic scheme in place (three force calls)
+    Parameters are the same as for leapfrog_step; a is unused and None is returned.
+    """
+    for c, d in zip(YOSHIDA_DRIFT, YOSHIDA_KICK):
+        _drift(r, v, K2, v_com, c * dt)
+        v += (d * dt) * accelerations(r, masses, K1)
+    _drift(r, v, K2, v_com, YOSHIDA_DRIFT[-1] * dt)
+    return None
+
+
+def _integrate(step, r, v, masses, K1, K2, dt, steps, substeps, v_com, positions, velocities, accelerations):
+    """
+    Function to repeat a step function and record every substeps-th state
+    """
+    if positions is None:
+        positions = np.empty((steps,) + r.shape)
+    positions[0] = r
+    if velocities is not None:
+        velocities[0] = v
+
+    a = None
+    for k in range(1, steps):
+        for _ in range(substeps):
+            a = step(r, v, a, masses, K1, K2, dt, v_com, accelerations)
+        positions[k] = r
+        if velocities is not None:
+            velocities[k] = v
+
+    return positions, velocities
+
+
+def leapfrog(r, v, masses, K1, K2, dt, steps, substeps=1, v_com=None,
+             positions=None, velocities=None, accelerations=nbody_accelerations):
+    """
+    Function to integrate with the kick-drift-kick leapfrog (2nd order, one force call per step)
+    :param r: Positions, shape (N, 3), advanced in place
+    :param v: Velocities, shape (N, 3), advanced in place
+    :param masses: Masses of the N bodies
+    :param K1: Normalized gravitational constant
+    :param K2: Normalized velocity-to-position constant
+    :param dt: Time step
+    :param steps: Number of recorded states (the first is the initial state)
+    :param substeps: Time steps taken between two recorded states
+    :param v_com: Optional centre-of-mass velocity subtracted from dr/dt
+    :param positions: Output buffer of shape (steps, N, 3), allocated if None
+    :param velocities: Optional output buffer of shape (steps, N, 3)
+    :param accelerations: Force kernel with the signature of nbody_accelerations
+    :return: Tuple (positions, velocities)
+    """
+    return _integrate(leapfrog_step, r, v, masses, K1, K2, dt, steps, substeps, v_com,
+                      positions, velocities, accelerations)
+
+
+def yoshida4(r, v, masses, K1, K2, dt, steps, substeps=1, v_com=None,
+             positions=None, velocities=None, accelerations=nbody_accelerations):
+    """
+    Function to integrate with Yoshida's 4th-order symplectic scheme (three force calls per step)
+    Parameters and return value are the same as for leapfrog.
+    """
+    return _integrate(yoshida4_step, r, v, masses, K1, K2, dt, steps, substeps, v_com,
+                      positions, velocities, accelerations)
+
+
+INTEGRATORS = {"leapfrog": leapfrog, "yoshida4": yoshida4}
+STEPS = {"leapfrog": leapfrog_step, "yoshida4": yoshida4_step}
+
+
+def fixed_step_solve(method, init_params, time_span, masses, K1, K2, v_com=None, substeps=1,
+                     accelerations=nbody_accelerations):
+    """
+    Function to integrate with a symplectic method, returning the same layout as scipy.integrate.odeint
+    :param method: "leapfrog" or "yoshida4"
+    :param init_params: Initial state [r1, ..., rN, v1, ..., vN]
+    :param time_span: Evenly spaced output times
+    :param masses: Masses of the N bodies
+    :param K1: Normalized gravitational constant
+    :param K2: Normalized velocity-to-position constant
+    :param v_com: Optional centre-of-mass velocity subtracted from dr/dt
+    :param substeps: Time steps taken between two output times
+    :param accelerations: Force kernel with the signature of nbody_accelerations
+    :return: Solution array of shape (len(time_span), 6N)
+    """
+    n = np.size(masses)
+    steps = len(time_span)
+    dt = (time_span[-1] - time_span[0]) / (steps - 1) / substeps if steps > 1 else 0.0
+
+    # Positions and velocities are written straight into views of one buffer
+    sol = np.empty((steps, 2, n, 3))
+    state = np.array(init_params, dtype="float64").reshape(2, n, 3)
+    INTEGRATORS[method](state[0], state[1], masses, K1, K2, dt, steps, substeps=substeps, v_com=v_com,
+                        positions=sol[:, 0], velocities=sol[:, 1], accelerations=accelerations)
+    return sol.reshape(steps, 6 * n)
+
+
+def solve(init_params, time_span, masses, K1, K2, v_com=None, integrator="odeint", gravity_solver="direct",
+          theta=0.5, substeps=16, jacobian=True, cache=None):
+    """
+    Function to integrate a system with the chosen integrator and gravity solver
+    :param init_params: Initial state [r1, ..., rN, v1, ..., vN]
+    :param time_span: Output times (evenly spaced for the fixed-step integrators)
+    :param masses: Masses of the N bodies
+    :param K1: Normalized gravitational constant
+    :param K2: Normalized velocity-to-position constant
+    :param v_com: Optional centre-of-mass velocity subtracted from dr/dt
+    :param integrator: "odeint" (adaptive LSODA), "leapfrog" or "yoshida4"
+    :param gravity_solver: "direct" (every pair) or "barnes-hut" (octree)
+    :param theta: Barnes-Hut opening angle
+    :param substeps: Fixed steps between two output times (leapfrog / yoshida4 only). The fixed time step suits
+                     orbits that stay apart: through close encounters, as in 3body.py and 3body_with_earth.py,
+                     even substeps=16 leaves energy errors of order 1 (see benchmarks/integrator_report.py), so
+                     keep odeint for those
+    :param jacobian: Hand odeint the analytic Jacobian (nbody_jacobian) for its stiff steps instead of
+                     finite differences (odeint with the direct gravity solver only)
+    :param cache: nbody.cache.TrajectoryCache returning the solution of an earlier run with the same inputs
+                  (None to always integrate)
+    :return: Solution array of shape (len(time_span), 6N); read-only and memory-mapped when it comes from the cache
+    """
+    if cache is not None:
+        from nbody.cache import trajectory_key  # Imported here: python -m nbody.cache runs it as a script
+
+        settings = dict(integrator=integrator, gravity_solver=gravity_solver, theta=theta, substeps=substeps,
+                        jacobian=jacobian)
+        key = trajectory_key(init_params, time_span, masses, K1, K2, v_com, **settings)
+        solution = cache.load(key)
+        if solution is None:
+            solution = solve(init_params, time_span, masses, K1, K2, v_com, **settings)
+            cache.store(key, solution)
+        return solution
+
+    if integrator == "odeint":
+        import scipy.integrate  # Imported here: it alone costs more than the rest of the core
+
+        if gravity_solver == "barnes-hut":
+            return scipy.integrate.odeint(barnes_hut_derivatives, init_params, time_span,
+                                          args=(masses, K1, K2, v_com, theta))
+        return scipy.integrate.odeint(nbody_derivatives, init_params, time_span, args=(masses, K1, K2, v_com),
+                                      Dfun=nbody_jacobian if jacobian else None)
+
+    accelerations = partial(barnes_hut_accelerations, theta=theta) if gravity_solver == "barnes-hut" else nbody_accelerations
+    return fixed_step_solve(integrator, init_params, time_span, masses, K1, K2, v_com, substeps=substeps,
+                            accelerations=accelerations)
@@ -0,0 +1,70 @@
+# Kepler orbits: positions of planets on fixed ellipses around the Sun
+
+import numpy as np  # For numerical calculations
+
+# Newton iterations never exceed this, whatever the eccentricity (e < 1)
+KEPLER_ITERATIONS = 12
+KEPLER_TOLERANCE = 1e-12
+
+
+def solve_kepler(M, e, iterations=KEPLER_ITERATIONS, tol=KEPLER_TOLERANCE):
+    """
+    Function to solve Kepler's equation E - e sin(E) = M for arrays of mean anomalies
+    :param M: Mean anomaly (radians), any shape
+    :param e: Eccentricity in [0, 1), broadcastable against M
+    :param iterations: Maximum number of Newton-Raphson iterations
+    :param tol: Entries whose last correction is below tol are left alone
+    :return: Eccentric anomaly E, broadcast shape of M and e, with M reduced to [-pi, pi)
+    """
+    M, e = np.broadcast_arrays(np.asarray(M, dtype="float64"), np.asarray(e, dtype="float64"))
+    M = np.mod(M + np.pi, 2 * np.pi) - np.pi
+
+    # Danby's starting guess keeps Newton-Raphson within a few steps even for e close to 1
+    E = M + 0.85 * e * np.sign(np.sin(M))
+    active = np.ones(M.shape, dtype=bool)
+    for _ in range(iterations):
+        f = E - e * np.sin(E) - M
+        f_prime = 1 - e * np.cos(E)
+        step = np.where(active, f / f_prime, 0.0)
+        E -= step
+        active &= np.abs(step) > tol  # Converged entries are masked out
+        if not active.any():
+            break
+    return E
+
+
+def kepler_positions(t, a, e, T):
+    """
+    Function to calculate the positions of many planets at many times in one call
+    :param t: Times since perihelion (seconds), shape (frames,) or (frames, planets)
+    :param a: Semi-major axes (meters), shape (planets,)
+    :param e: Eccentricities, shape (planets,)
+    :param T: Orbital periods (seconds), shape (planets,)
+    :return: Positions, shape (frames, planets, 3); the orbits lie in the x-z plane
+    """
+    t = np.asarray(t, dtype="float64")
+    if t.ndim == 1:
+        t = t[:, np.newaxis]
+    a, e, T = (np.asarray(value, dtype="float64") for value in (a, e, T))
+
+    M = 2 * np.pi / T * t  # Mean anomaly
+    E = solve_kepler(M, e)
+
+    positions = np.zeros(E.shape + (3,))
+    positions[..., 0] = a * (np.cos(E) - e)  # r cos(true anomaly)
+    positions[..., 2] = a * np.sqrt(1 - e ** 2) * np.sin(E)  # r sin(true anomaly)
+    return positions
+
+
+# Function to calculate Solar system stars' position at a given time
+def calculate_position(t, a, e, T):
+    """
+    Function to calculate the position of a planet on its orbit at a given time
+    :param t: Time since perihelion (seconds)
+    :param a: Semi-major axis (meters)
+    :param e: Eccentricity
+    :param T: Orbital period (seconds)
+    :return: Tuple (x, y, z); the orbit lies in the x-z plane
+    """
+    x, y, z = kepler_positions([t], [a], [e], [T])[0, 0]
+    return x, y, z
@@ -0,0 +1,136 @@
+# Frame planning: which simulation time each animation frame shows, and how long each frame stays on screen
+
+from collections import namedtuple
+
+import numpy as np  # For numerical calculations
+
+# Simulation time of every frame and the number of frame intervals (1 / fps) it is held for
+FramePlan = namedtuple("FramePlan", ["times", "holds"])
+
+# Frames whose bodies moved less than this fraction of the plot extent are merged into the previous frame
+STILL_TOLERANCE = 2.5e-4
+
+# Frames a preview shows unless told otherwise (a 4 x 4 contact sheet)
+PREVIEW_COUNT = 16
+
+
+def plan_frames(t_start, t_end, duration, fps=24, end_hold=0.0):
+    """
+    Function to spread the frames of an animation evenly over a span of simulation time
+    :param t_start: Simulation time of the first frame
+    :param t_end: Simulation time of the last frame
+    :param duration: Seconds of animation from t_start to t_end
+    :param fps: Frames per second
+    :param end_hold: Extra seconds the final state stays on screen
+    :return: FramePlan, one entry per frame
+    """
+    moving = max(2, int(round(duration * fps)))
+    times = np.concatenate((np.linspace(t_start, t_end, moving), np.full(int(round(end_hold * fps)), float(t_end))))
+    return FramePlan(times, np.ones(len(times), dtype=int))
+
+
+def preview_frames(total_frames, first=0, last=None, step=None, count=PREVIEW_COUNT):
+    """
+    Function to pick the frames of a preview
+    :param total_frames: Number of frames of the full animation
+    :param first: First frame of the range previewed
+    :param last: Last frame of the range previewed (default: the last frame)
+    :param step: Take every step-th frame of the range (default: count frames spread evenly over it)
+    :param count: Number of frames when no step is given
+    :return: Increasing frame indices
+    """
+    last = total_frames - 1 if last is None else min(last, total_frames - 1)
+    if step is not None:
+        return np.arange(first, last + 1, step)
+    return np.unique(np.linspace(first, last, count).round().astype(int))
+
+
+def split_solution(solution, K2, v_com=None):
+    """
+    Function to split a solution [r1, ..., rN, v1, ..., vN] into positions and their rates of change
+    :param solution: States over time, shape (T, 6N)
+    :param K2: Normalized velocity-to-position constant
+    :param v_com: Centre-of-mass velocity subtracted from dr/dt, if the run used one
+    :return: Tuple (positions, rates), both of shape (T, N, 3)
+    """
+    states = np.reshape(solution, (len(solution), 2, -1, 3))
+    rates = K2 * states[:, 1]
+    if v_com is not None:
+        rates -= v_com
+    return states[:, 0], rates
+
+
+def resample(time_span, positions, times, rates=None):
+    """
+    Function to interpolate stored positions at the planned frame times
+    :param time_span: Sample times, increasing, shape (T,)
+    :param positions: Positions at the sample times, shape (T, ...)
+    :param times: Frame times within time_span, shape (frames,)
+    :param rates: Time derivatives of the positions (cubic Hermite interpolation), or None (linear)
+    :return: Positions at the frame times, shape (frames, ...); exact at the sample times
+    """
+    time_span = np.asarray(time_span, dtype="float64")
+    positions = np.asarray(positions)
+    k = np.clip(np.searchsorted(time_span, times, side="right") - 1, 0, len(time_span) - 2)
+    h = time_span[k + 1] - time_span[k]
+    s = ((times - time_span[k]) / h).reshape((-1,) + (1,) * (positions.ndim - 1))
+    p0, p1 = positions[k], positions[k + 1]
+    if rates is None:
+        return p0 + s * (p1 - p0)
+
+    m0, m1 = rates[k] * h[:, np.newaxis, np.newaxis], rates[k + 1] * h[:, np.newaxis, np.newaxis]
+    s2 = s * s
+    s3 = s2 * s
+    return ((2 * s3 - 3 * s2 + 1) * p0 + (s3 - 2 * s2 + s) * m0
+            + (-2 * s3 + 3 * s2) * p1 + (s3 - s2) * m1)
+
+
+def resample_chunks(chunks, times, K2, v_com=None):
+    """
+    Function to interpolate a solution arriving in chunks at the planned frame times (see resample)
+    :param chunks: Iterable of tuples (sample times, states), e.g. nbody.stream.solve_chunks
+    :param times: Frame times, increasing
+    :param K2: Normalized velocity-to-position constant
+    :param v_com: Centre-of-mass velocity subtracted from dr/dt, if the run used one
+    :return: Generator of positions at the frame times covered by each chunk, arrays of shape (frames, N, 3);
+             concatenated, the same as resample on the whole solution
+    """
+    times = np.asarray(times)
+    done = 0  # Frames handed out
+    previous = None  # Last sample of the previous chunk, the start of the interval across the boundary
+    for span, states in chunks:
+        positions, rates = split_solution(states, K2, v_com)
+        if previous is not None:
+            span = np.concatenate((previous[0], span))
+            positions, rates = np.concatenate((previous[1], positions)), np.concatenate((previous[2], rates))
+        previous = span[-1:], positions[-1:], rates[-1:]
+        end = np.searchsorted(times, span[-1], side="right")
+        if end > done and len(span) > 1:
+            yield resample(span, positions, times[done:end], rates)
+            done = end
+
+
+def merge_still_frames(positions, holds, tolerance=STILL_TOLERANCE):
+    """
+    Function to drop frames that would look the same as the frame before them, holding that frame longer instead
+    :param positions: Points that set the look of every frame (bodies, ends of their trails), shape (frames, P, 3)
+    :param holds: Frame intervals each frame is held for, shape (frames,)
+    :param tolerance: Movement below this fraction of the plot extent counts as still
+    :return: Tuple (indices of the frames to draw, their holds)
+    """
+    positions = np.asarray(positions)
+    if len(positions) == 0:  # e.g. a one-frame animation, whose only frame is drawn by the caller
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    limit = tolerance * (positions.max() - positions.min())
+
+    # A frame is kept when some point moved visibly since the last kept frame (not the previous frame,
+    # so that slow drifts still add up)
+    keep = [0]
+    merged = [int(holds[0])]
+    for i in range(1, len(positions)):
+        if np.abs(positions[i] - positions[keep[-1]]).max() > limit:
+            keep.append(i)
+            merged.append(int(holds[i]))
+        else:
+            merged[-1] += int(holds[i])
+    return np.array(keep), np.array(merged)
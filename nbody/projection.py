@@ -0,0 +1,146 @@
+# Camera projection: drawing 3D scenes as plain 2D artists projected in one NumPy pass per frame
+#
+# mplot3d projects every 3D artist separately when the figure is drawn. Here the
+# points of all trails and bodies go through the axes' projection matrix at once
+# and are handed to 2D collections already projected. The 3D axes still draws
+# the panes, grid, ticks and labels, so frames keep the look of the mplot3d ones.
+
+import numpy as np  # For numerical calculations
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.colors import to_rgba
+from matplotlib.markers import MarkerStyle
+from matplotlib.path import Path
+from matplotlib.transforms import IdentityTransform
+
+
+class Camera:
+    """
+    Projection of a 3D axes, as Axes3D.draw computes it
+
+    The projection matrix only changes with the limits or the view angles of
+    the axes: call update() after changing them.
+    """
+
+    def __init__(self, ax):
+        """
+        Function to set up the camera of a 3D axes
+        :param ax: 3D axes (its limits and view angles should already be set)
+        """
+        self.ax = ax
+        self.update()
+
+    def update(self):
+        """
+        Function to recompute the projection matrix and the depth range of the axes box
+        """
+        self.M = self.ax.get_proj()
+        limits = np.reshape(self.ax.get_w_lims(), (3, 2))
+        corners = np.stack(np.meshgrid(*limits, indexing="ij"), axis=-1).reshape(-1, 3)
+        depth = self.project(corners)[1]
+        self.near, self.far = depth.min(), depth.max()
+
+    def project(self, points):
+        """
+        Function to project points onto the axes
+        :param points: Array of shape (..., 3) in data coordinates
+        :return: Tuple (xy, depth): 2D coordinates of shape (..., 2) in the axes' projected data space and
+                 depth of shape (...), larger is farther
+        """
+        h = points @ self.M[:, :3].T + self.M[:, 3]
+        return h[..., :2] / h[..., 3:], h[..., 2] / h[..., 3]
+
+    def depth_scale(self, depth, strength):
+        """
+        Function to scale marker sizes by depth
+        :param depth: Depths returned by project
+        :param strength: Relative growth of the nearest markers over the farthest (0 for fixed sizes)
+        :return: Factors, 1 + strength / 2 at the near side of the axes box and 1 - strength / 2 at the far side
+        """
+        return 1 + strength * (0.5 - (depth - self.near) / (self.far - self.near))
+
+
+class FlatLineCollection(LineCollection):
+    """
+    Polylines of projected points drawn on a 3D axes
+
+    Polylines sharing a colour and a width are merged into one path with a
+    MOVETO at each start, so a belt of thousands of asteroids costs a few Path
+    objects per frame instead of one each. Axes3D.draw orders its collections
+    by the depth do_3d_projection returns: the collection keeps the depth of
+    its nearest point.
+    """
+
+    depth = np.nan
+
+    def __init__(self, colors, linewidths, **kwargs):
+        """
+        Function to group the polylines by style
+        :param colors: Colour of each polyline
+        :param linewidths: Width of each polyline
+        :param kwargs: Other LineCollection properties
+        """
+        groups = {}
+        for i, style in enumerate(zip(map(to_rgba, colors), linewidths)):
+            groups.setdefault(style, []).append(i)  # Dictionaries keep the order of first appearance
+        super().__init__([], colors=[color for color, _ in groups], linewidths=[width for _, width in groups],
+                         **kwargs)
+        self._groups = [np.array(members) for members in groups.values()]
+        self._group_of = np.empty(sum(len(members) for members in self._groups), dtype=int)
+        for group, members in enumerate(self._groups):
+            self._group_of[members] = group
+
+    def set_polylines(self, xy, lengths=None):
+        """
+        Function to replace the polylines
+        :param xy: Projected points, shape (polylines, length, 2), or with lengths the points of all polylines one
+                   after another, shape (points, 2)
+        :param lengths: Number of points of each polyline, shape (polylines,), when they differ
+        """
+        if lengths is None:
+            codes = np.full(xy.shape[1], Path.LINETO, dtype=Path.code_type)
+            codes[0] = Path.MOVETO
+            self._paths = [Path(xy[members].reshape(-1, 2), np.tile(codes, len(members)))
+                           for members in self._groups]
+        else:
+            # Points sorted by group (stable, so each polyline stays in one piece), a MOVETO at every start
+            group = np.repeat(self._group_of, lengths)
+            order = np.argsort(group, kind="stable")
+            codes = np.full(len(xy), Path.LINETO, dtype=Path.code_type)
+            codes[np.cumsum(lengths) - lengths] = Path.MOVETO
+            bounds = np.searchsorted(group[order], np.arange(len(self._groups) + 1))
+            xy, codes = xy[order], codes[order]
+            self._paths = [Path(xy[a:b], codes[a:b]) for a, b in zip(bounds[:-1], bounds[1:])]
+        self.stale = True
+
+    def do_3d_projection(self):
+        return self.depth
+
+
+class FlatPathCollection(PathCollection):
+    """
+    PathCollection (markers) at projected offsets drawn on a 3D axes, see FlatLineCollection
+    """
+
+    depth = np.nan
+
+    def do_3d_projection(self):
+        return self.depth
+
+
+def flat_markers(ax, colors, sizes, marker="o", linewidth=1.5):
+    """
+    Function to add scatter-style markers that are positioned in projected coordinates
+    :param ax: 3D axes
+    :param colors: Colour of each marker
+    :param sizes: Marker areas in points^2
+    :param marker: Marker style
+    :param linewidth: Edge width, as scatter uses (lines.linewidth)
+    :return: FlatPathCollection
+    """
+    style = MarkerStyle(marker)
+    markers = FlatPathCollection([style.get_path().transformed(style.get_transform())], sizes=sizes,
+                                 offsets=np.zeros((len(sizes), 2)), offset_transform=ax.transData,
+                                 facecolors=colors, edgecolors=colors, linewidths=linewidth,
+                                 transform=IdentityTransform())  # Marker paths scaled by sizes, as in scatter
+    ax.add_collection(markers, autolim=False)
+    return markers
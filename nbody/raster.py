@@ -0,0 +1,230 @@
+# Raster rendering: projecting bodies and trails straight into an RGBA array with NumPy (no Matplotlib drawing)
+#
+# Every frame is accumulated into a preallocated float image (np.add.at, np.bincount):
+# colours add up, so overlapping particles brighten (a soft glow for star
+# fields) and saturate at white. The frames are plain uint8 RGBA arrays that
+# any sink of nbody.sinks takes, GIF or video.
+
+import numpy as np  # For numerical calculations
+
+from nbody.sinks import open_sink
+
+# Default camera: Matplotlib's 3D view angles (elevation, azimuth) in degrees
+RASTER_VIEW = (30, -60)
+
+
+def as_positions(trajectories):
+    """
+    Function to bring trajectories to one array of shape (frames, bodies, 3)
+    :param trajectories: List of (T, 3) arrays (r1_sol, r2_sol, ...), a solution of shape (T, 6N)
+                         ([r1, ..., rN, v1, ..., vN], e.g. two_body_sol), or an array of shape (T, N, 3)
+    :return: Array of shape (T, N, 3)
+    """
+    if isinstance(trajectories, (list, tuple)):
+        return np.stack([np.asarray(traj) for traj in trajectories], axis=1)
+    positions = np.asarray(trajectories)
+    if positions.ndim == 3:
+        return positions
+    if positions.shape[1] == 3:
+        return positions[:, np.newaxis]
+    return positions[:, :positions.shape[1] // 2].reshape(len(positions), -1, 3)
+
+
+def body_colors(colors, bodies):
+    """
+    Function to convert colours to RGB intensities
+    :param colors: One colour for all bodies or one per body: names (read by matplotlib.colors) or RGB in [0, 1];
+                   None for white
+    :param bodies: Number of bodies
+    :return: Array of shape (bodies, 3), values in [0, 255]
+    """
+    if colors is None:
+        return np.full((bodies, 3), 255.0)
+    if isinstance(colors, str) or any(isinstance(color, str) for color in colors):
+        from matplotlib.colors import to_rgba_array  # Colour names only; nothing is drawn with Matplotlib
+        colors = to_rgba_array(colors)[:, :3]
+    return np.broadcast_to(255.0 * np.asarray(colors, dtype=float).reshape(-1, 3), (bodies, 3))
+
+
+class Rasterizer:
+    """
+    Orthographic camera and additive RGBA frame buffer
+
+    Points are projected with one matrix product and summed per pixel: with
+    np.add.at when they are few, with np.bincount over the whole frame when
+    they are many. Particles are spread by a small kernel (a disc, or a
+    Gaussian for glow): a few are splatted kernel offset by kernel offset,
+    dense ones are binned once and the kernel is applied as shifted adds of
+    the binned layer. Line segments are sampled once per pixel along their length,
+    either into the frame or into a kept layer that every later frame starts
+    from, so a trail that only grows costs one new segment per frame.
+    """
+
+    def __init__(self, width, height, bounds, view=RASTER_VIEW, background=(0, 0, 0), margin=0.9):
+        """
+        Function to set up the camera and the frame buffer
+        :param width: Frame width in pixels
+        :param height: Frame height in pixels
+        :param bounds: Tuple (lowest, highest) corner of the box the camera frames, each of shape (3,)
+        :param view: Tuple (elevation, azimuth) of the camera in degrees
+        :param background: RGB colour of the background, values in [0, 255]
+        :param margin: Fraction of the smaller frame side the box spans
+        """
+        self.width, self.height = width, height
+        elev, azim = np.radians(view)
+        right = np.array([-np.sin(azim), np.cos(azim), 0])
+        up = np.array([-np.sin(elev) * np.cos(azim), -np.sin(elev) * np.sin(azim), np.cos(elev)])
+        lowest, highest = np.asarray(bounds[0], dtype=float), np.asarray(bounds[1], dtype=float)
+        self.center = (lowest + highest) / 2
+        radius = max(np.linalg.norm(highest - lowest) / 2, np.finfo(float).tiny)
+        scale = margin * min(width, height) / (2 * radius)
+        self.axes = np.stack([right * scale, -up * scale], axis=1)  # Data to pixels (y grows downwards)
+
+        self.background = np.asarray(background, dtype=np.float32)
+        self._sum = np.empty((3, height * width), dtype=np.float32)
+        self._layer = np.empty_like(self._sum)  # Binned particles before the kernel spreads them
+        self._kept = None  # Lines kept from frame to frame, allocated by the first of them
+        self._rgba = np.empty((height, width, 4), dtype=np.uint8)
+        self._rgba[..., 3] = 255
+        self.clear()
+
+    def project(self, points):
+        """
+        Function to project points onto the frame
+        :param points: Array of shape (..., 3)
+        :return: Pixel coordinates (column, row) as floats, shape (..., 2)
+        """
+        return (points - self.center) @ self.axes + (self.width / 2, self.height / 2)
+
+    def clear(self):
+        """
+        Function to start a new frame, from the background and the kept lines
+        """
+        self._sum[:] = self.background[:, np.newaxis]
+        if self._kept is not None:
+            self._sum += self._kept
+
+    def _accumulate(self, xy, rgb, out=None):
+        """
+        Function to add colours at pixel coordinates, dropping those outside the frame
+        :param xy: Pixel coordinates, shape (points, 2)
+        :param rgb: Colour of each point, shape (points, 3)
+        :param out: Buffer of shape (3, height * width) (default: the frame)
+        """
+        out = self._sum if out is None else out
+        col, row = np.floor(xy).astype(np.int64).T
+        inside = (col >= 0) & (col < self.width) & (row >= 0) & (row < self.height)
+        pixels = (row * self.width + col)[inside]
+        sparse = len(pixels) < out.shape[1] // 8  # Binning touches every pixel of the frame
+        for channel in range(3):
+            if sparse:
+                np.add.at(out[channel], pixels, rgb[inside, channel])
+            else:
+                out[channel] += np.bincount(pixels, weights=rgb[inside, channel], minlength=out.shape[1])
+
+    def splat(self, points, rgb, radius=1, glow=False):
+        """
+        Function to draw particles
+        :param points: Positions, shape (points, 3)
+        :param rgb: Colour of each particle, shape (points, 3), values in [0, 255]
+        :param radius: Kernel radius in pixels (0 for single pixels)
+        :param glow: Gaussian kernel (a soft halo adding up in dense regions) instead of a solid disc
+        """
+        xy = self.project(points)
+        offsets = np.stack(np.meshgrid(np.arange(-radius, radius + 1), np.arange(-radius, radius + 1)),
+                           axis=-1).reshape(-1, 2)
+        distance2 = (offsets ** 2).sum(axis=1)
+        if glow:
+            weights = np.exp(-distance2 / (0.5 * max(radius, 1) ** 2))
+        else:
+            keep = distance2 <= radius ** 2 + radius  # A rounder disc than distance <= radius
+            offsets, weights = offsets[keep], np.ones(keep.sum())
+        if len(points) * len(offsets) < self.width * self.height:
+            for offset, weight in zip(offsets, weights):
+                self._accumulate(xy + offset, rgb * weight)
+            return
+
+        # Dense particles: bin them once, then add the binned layer shifted by every kernel offset
+        self._layer[:] = 0
+        self._accumulate(xy, rgb, self._layer)
+        layer = self._layer.reshape(3, self.height, self.width)
+        total = self._sum.reshape(3, self.height, self.width)
+        for (dx, dy), weight in zip(offsets, weights):
+            total[:, max(dy, 0):self.height + min(dy, 0), max(dx, 0):self.width + min(dx, 0)] += \
+                weight * layer[:, max(-dy, 0):self.height - max(dy, 0), max(-dx, 0):self.width - max(dx, 0)]
+
+    def lines(self, starts, ends, rgb, keep=False):
+        """
+        Function to draw line segments, sampled once per pixel along each segment
+        :param starts: First ends of the segments, shape (segments, 3)
+        :param ends: Second ends of the segments, shape (segments, 3)
+        :param rgb: Colour of each segment, shape (segments, 3), values in [0, 255]
+        :param keep: Draw them into the kept layer instead, shown from the next clear() on in every frame
+        """
+        if keep and self._kept is None:
+            self._kept = np.zeros_like(self._sum)
+        a, b = self.project(starts), self.project(ends)
+        samples = np.ceil(np.abs(b - a).max(axis=1)).astype(np.int64) + 1
+        segment = np.repeat(np.arange(len(samples)), samples)
+        first = np.cumsum(samples) - samples
+        t = (np.arange(samples.sum()) - first[segment]) / samples[segment]
+        self._accumulate(a[segment] + t[:, np.newaxis] * (b - a)[segment], rgb[segment],
+                         self._kept if keep else None)
+
+    def frame(self):
+        """
+        Function to finish the frame
+        :return: RGBA array of shape (height, width, 4), dtype uint8; reused by the next frame
+        """
+        np.minimum(self._sum, 255, out=self._sum)
+        self._rgba[..., :3] = self._sum.T.reshape(self.height, self.width, 3)
+        return self._rgba
+
+
+def raster_frames(trajectories, colors=None, width=480, height=480, trail_length=None, radius=1, glow=False,
+                  trail_brightness=0.6, view=RASTER_VIEW):
+    """
+    Function to draw the frames of an N-body animation without Matplotlib
+    :param trajectories: Positions over time, see as_positions
+    :param colors: Colour of each body, see body_colors
+    :param width: Frame width in pixels
+    :param height: Frame height in pixels
+    :param trail_length: Number of past points drawn behind each body (None for the whole orbit, 0 for none);
+                         whole orbits are kept from frame to frame and cost one segment per body and frame,
+                         bounded trails are redrawn every frame and cost trail_length segments per body
+    :param radius: Particle radius in pixels
+    :param glow: Draw the particles as additive Gaussian halos
+    :param trail_brightness: Intensity of the trails relative to the particles
+    :param view: Tuple (elevation, azimuth) of the camera in degrees
+    :return: Generator of RGBA frames (the same array every time, valid until the next frame)
+    """
+    positions = as_positions(trajectories)
+    rgb = body_colors(colors, positions.shape[1])
+    raster = Rasterizer(width, height, (positions.min(axis=(0, 1)), positions.max(axis=(0, 1))), view)
+    for i in range(len(positions)):
+        if trail_length is None and i > 0:
+            # Whole orbits only grow: add the newest segment to the kept layer rather than redrawing them
+            raster.lines(positions[i - 1], positions[i], trail_brightness * rgb, keep=True)
+        raster.clear()
+        start = i if trail_length is None else max(i - trail_length, 0)
+        if i > start:
+            trail = positions[start:i + 1]  # (points, bodies, 3)
+            raster.lines(trail[:-1].reshape(-1, 3), trail[1:].reshape(-1, 3),
+                         np.tile(trail_brightness * rgb, (i - start, 1)))
+        raster.splat(positions[i], rgb, radius, glow)
+        yield raster.frame()
+
+
+def save_raster(trajectories, filename, colors=None, fps=24, sink_options=None, **options):
+    """
+    Function to save an N-body animation drawn by raster_frames
+    :param trajectories: Positions over time, see as_positions
+    :param filename: Output file: .gif, or a video (.mp4, .webm, ...) encoded by ffmpeg
+    :param colors: Colour of each body, see body_colors
+    :param fps: Frames per second
+    :param sink_options: Options of the output sink, e.g. dict(codec="libx265", crf=28) for videos
+    :param options: Options of raster_frames (width, height, trail_length, radius, glow, ...)
+    """
+    with open_sink(filename, fps=fps, **(sink_options or {})) as sink:
+        for frame in raster_frames(trajectories, colors, **options):
+            sink.write(frame)
@@ -0,0 +1,714 @@
+# Plotting and animation of the simulations
+#
+# matplotlib is only imported when something is drawn, so importing this
+# module (or the physics core) stays cheap.
+
+import time
+from collections.abc import Iterator
+
+import numpy as np  # For numerical calculations
+
+from nbody.ephemeris import EPHEMERIS_CACHE, EPHEMERIS_RESOLUTION, interpolate, load_table
+from nbody.frames import render_frames
+from nbody.planner import STILL_TOLERANCE, merge_still_frames, plan_frames, preview_frames
+from nbody.sinks import open_sink
+
+# Figure size of the N-body animations (the solar system uses matplotlib's default)
+BODIES_FIGSIZE = (15, 15)
+
+# Bodies listed in the legend of the solar system animation (the Sun and the first catalog rows)
+MAX_LEGEND_ENTRIES = 16
+
+# Width in pixels of preview frames (their dpi follows from the figure size)
+PREVIEW_WIDTH = 320
+
+
+def _matplotlib():
+    """
+    Function to import matplotlib on first use
+    :return: Tuple (pyplot, animation)
+    """
+    import matplotlib.pyplot as plt  # For plotting
+    from mpl_toolkits.mplot3d import Axes3D  # noqa: F401  (registers the 3D projection)
+    from matplotlib import animation  # For creating animations
+    return plt, animation
+
+
+class TrailBuffer:
+    """
+    Fixed-capacity ring buffer holding the most recent positions of several bodies
+
+    Every point is written twice, at slot and slot + capacity, so the last
+    `capacity` points are always one contiguous slice of the storage and the
+    trail can be handed to matplotlib as a view without copying or reordering.
+    """
+
+    def __init__(self, capacity, bodies):
+        """
+        Function to allocate the buffer
+        :param capacity: Maximum number of points kept per body
+        :param bodies: Number of bodies
+        """
+        self.capacity = int(capacity)
+        self._data = np.empty((2 * self.capacity, bodies, 3))
+        self._count = 0  # Points written since the last reset
+
+    def __len__(self):
+        return min(self._count, self.capacity)
+
+    def reset(self):
+        """
+        Function to empty the trail
+        """
+        self._count = 0
+
+    def append(self, positions):
+        """
+        Function to add one point to every trail
+        :param positions: Positions of the bodies, shape (bodies, 3)
+        """
+        slot = self._count % self.capacity
+        self._data[slot] = positions
+        self._data[slot + self.capacity] = positions
+        self._count += 1
+
+    def view(self):
+        """
+        Function to get the stored trail, oldest point first
+        :return: View of shape (length, bodies, 3)
+        """
+        end = (self._count - 1) % self.capacity + self.capacity + 1 if self._count else self.capacity
+        return self._data[end - len(self):end]
+
+
+class DecimatedTrail:
+    """
+    Orbit trails of several bodies simplified to screen resolution as they grow
+
+    Each trail is a list of kept vertices plus a moving head (its newest
+    point). When a point arrives the head is kept only if it lies at least
+    `tolerance` from the last kept vertex, so a frame costs one vectorized
+    distance test however long the trails are; points closer than a pixel
+    never reach matplotlib. A trail reaching max_vertices drops every other
+    vertex and doubles its tolerance. drawn / points count the vertices handed
+    out against those of the full trails.
+    """
+
+    def __init__(self, bodies, tolerance, max_vertices=2000):
+        """
+        Function to allocate the trails
+        :param bodies: Number of bodies
+        :param tolerance: Smallest distance between kept vertices (data units, about one pixel)
+        :param max_vertices: Most vertices kept per trail
+        """
+        self.bodies = bodies
+        self.base_tolerance = float(tolerance)
+        self.max_vertices = int(max_vertices)
+        self.drawn = 0  # Vertices handed out by view()
+        self.points = 0  # Vertices the full trails would have had
+        self._vertices = np.zeros((bodies, self.max_vertices, 3))
+        self._frames = np.empty((bodies, self.max_vertices), dtype=int)  # Frame each vertex was recorded at
+        self._head = np.empty((bodies, 3))
+        self.reset()
+
+    def reset(self):
+        """
+        Function to empty the trails
+        """
+        self.tolerance = np.full(self.bodies, self.base_tolerance)
+        self._first = np.zeros(self.bodies, dtype=int)  # Oldest vertex still inside each trail
+        self._count = np.zeros(self.bodies, dtype=int)
+        self.frame = -1  # Frame of the head (-1 while empty)
+        self._start = 0
+
+    def append(self, positions, start=0):
+        """
+        Function to add one point to every trail
+        :param positions: Newest positions of the bodies, shape (bodies, 3)
+        :param start: Frame of the oldest point still in the trails, the tail view() is given (vertices up to
+                      it expire)
+        """
+        rows = np.arange(self.bodies)
+        if self.frame >= 0:
+            last = self._vertices[rows, np.maximum(self._count - 1, 0)]
+            keep = (self._count == self._first) | \
+                (((self._head - last) ** 2).sum(axis=1) >= self.tolerance ** 2)
+            for body in np.nonzero(keep & (self._count == self.max_vertices))[0]:
+                self._compact(body)
+            kept = rows[keep]
+            self._vertices[kept, self._count[kept]] = self._head[kept]
+            self._frames[kept, self._count[kept]] = self.frame
+            self._count[kept] += 1
+        self._head[:] = positions
+        self.frame += 1
+        self._start = start
+
+        # Frames advance one at a time, so at most a vertex or two expire per trail
+        while True:
+            expired = (self._first < self._count) & \
+                (self._frames[rows, np.minimum(self._first, self.max_vertices - 1)] <= start)
+            if not expired.any():
+                break
+            self._first += expired
+
+    def _compact(self, body):
+        """
+        Function to make room in a full trail: move it to the front, thinned out if it is still long
+        """
+        index = np.arange(self._first[body], self._count[body])
+        if len(index) > self.max_vertices // 2:
+            index = index[::-1][::2][::-1]  # Every other vertex, keeping the newest
+            self.tolerance[body] *= 2
+        self._vertices[body, :len(index)] = self._vertices[body, index]
+        self._frames[body, :len(index)] = self._frames[body, index]
+        self._first[body], self._count[body] = 0, len(index)
+
+    def view(self, tail):
+        """
+        Function to get the simplified trails
+        :param tail: Oldest point of every trail (at frame start), shape (bodies, 3), put before the kept vertices
+        :return: Tuple (points, lengths): vertices of all trails one after another, shape (vertices, 3),
+                 and the number of vertices of each trail, shape (bodies,)
+        """
+        live = self._count - self._first
+        lengths = live + 2
+        owner = np.repeat(np.arange(self.bodies), lengths)
+        j = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) - 1  # -1 is the tail
+        points = self._vertices[owner, np.clip(self._first[owner] + j, 0, self.max_vertices - 1)]
+        head = j == live[owner]
+        points[head] = self._head[owner[head]]
+        points[j < 0] = tail
+        self.drawn += len(points)
+        self.points += self.bodies * (self.frame - self._start + 1)
+        return points, lengths
+
+
+def style_axes(fig, ax, title):
+    """
+    Function to apply the black-background look shared by all animations
+    :param fig: Figure
+    :param ax: 3D axes
+    :param title: Title of the plot
+    """
+    # Add labels and title
+    fig.patch.set_facecolor('black')
+    ax.set_xlabel("x-coordinate", fontsize=14)
+    ax.set_ylabel("y-coordinate", fontsize=14)
+    ax.set_zlabel("z-coordinate", fontsize=14)
+    ax.set_title(title, fontsize=14)
+    ax.title.set_color('white')
+    ax.xaxis.label.set_color('white')
+    ax.yaxis.label.set_color('white')
+    ax.zaxis.label.set_color('white')
+    ax.tick_params(colors='white')
+
+    # Change the plot background color to black
+    ax.set_facecolor('black')
+
+
+def _set_trails(lines, stars, points, lengths):
+    """
+    Function to move the orbit lines and the star markers to trails from DecimatedTrail.view
+    """
+    for line, star, trail in zip(lines, stars, np.split(points, np.cumsum(lengths)[:-1])):
+        line.set_data(trail[:, 0], trail[:, 1])
+        line.set_3d_properties(trail[:, 2])
+        star.set_data(trail[-1:, 0], trail[-1:, 1])
+        star.set_3d_properties(trail[-1:, 2])
+
+
+def bodies_scene(fig, trajectories, labels, colors, title, trail_length=None, lod=None):
+    """
+    Function to draw an N-body system onto a figure
+    :param fig: Figure
+    :param trajectories: Positions of each body over time, list of (T, 3) arrays
+    :param labels: Legend label of each body
+    :param colors: Colour of each body
+    :param title: Title of the plot
+    :param trail_length: Number of past points drawn behind each body (None for the whole orbit)
+    :param lod: Simplify the orbits to about this many pixels (see DecimatedTrail; None to draw every point)
+    :return: Tuple (animate, init): animate(i) draws frame i, init() clears the orbits
+    """
+    # Create 3D axes
+    ax = fig.add_subplot(111, projection="3d")
+    style_axes(fig, ax, title)
+
+    # Lines to represent the orbits and markers to represent the stars (initialize with empty data)
+    lines = [ax.plot([], [], [], color=color, label=label)[0] for label, color in zip(labels, colors)]
+    stars = [ax.plot([], [], [], 'o', color=color)[0] for color in colors]
+
+    def init():
+        # Initialize lines with empty data
+        for artist in lines + stars:
+            artist.set_data([], [])
+            artist.set_3d_properties([])
+
+        buffer = 0.1  # Adjust this value as needed
+        max_range = max(traj.max() for traj in trajectories) + buffer
+        min_range = min(traj.min() for traj in trajectories) - buffer
+        ax.set_xlim(min_range, max_range)
+        ax.set_ylim(min_range, max_range)
+        ax.set_zlim(min_range, max_range)
+
+        return lines + stars
+
+    def trail_start(i):
+        return 0 if trail_length is None else max(i - trail_length, 0)
+
+    def animate(i):
+        # Extract trajectories up to frame i
+        if i > 0 and decimated is not None:
+            # Frame i adds point i - 1 to the simplified orbits: catch up first if frames were skipped
+            if decimated.frame != i - 2:
+                decimated.reset()
+                for k in range(1, i):
+                    decimated.append(positions[min(k, len(positions)) - 1], trail_start(k))
+            start = trail_start(i)
+            decimated.append(positions[min(i, len(positions)) - 1], start)
+            _set_trails(lines, stars, *decimated.view(positions[min(start, len(positions) - 1)]))
+        elif i > 0:  # Check if arrays have data
+            for line, star, traj in zip(lines, stars, trajectories):
+                start = trail_start(i)
+                x, y, z = traj[start:i, 0], traj[start:i, 1], traj[start:i, 2]
+                line.set_data(x, y)
+                line.set_3d_properties(z)
+
+                # Update star positions
+                star.set_data(x[-1:], y[-1:])
+                star.set_3d_properties(z[-1:])
+
+        return lines + stars
+
+    # Add the legend
+    ax.legend()
+    init()
+
+    # Simplified orbits: lod pixels in data units, from the axes extent over its size on screen
+    decimated = None
+    if lod is not None:
+        positions = np.stack(trajectories, axis=1)
+        pixels = min(ax.bbox.width, ax.bbox.height)
+        decimated = DecimatedTrail(len(trajectories), lod * np.ptp(ax.get_xlim()) / pixels)
+    animate.decimated = decimated
+
+    return animate, init
+
+
+def streamed_bodies_scene(fig, labels, colors, title, trail_length=None, lod=1.0):
+    """
+    Function to draw an N-body system onto a figure from positions arriving one frame at a time
+    :param fig: Figure
+    :param labels: Legend label of each body
+    :param colors: Colour of each body
+    :param title: Title of the plot
+    :param trail_length: Number of past points drawn behind each body (None for the whole orbit)
+    :param lod: Simplify the orbits to about this many pixels (None keeps every point up to DecimatedTrail's cap)
+    :return: Tuple (animate, fit): animate(positions) draws the next frame from the positions of the bodies,
+             shape (N, 3); fit(points) widens the axes limits to take in points of shape (..., 3) (call it with
+             each chunk before drawing its frames)
+    """
+    # Same axes and artists as bodies_scene
+    ax = fig.add_subplot(111, projection="3d")
+    style_axes(fig, ax, title)
+    lines = [ax.plot([], [], [], color=color, label=label)[0] for label, color in zip(labels, colors)]
+    stars = [ax.plot([], [], [], 'o', color=color)[0] for color in colors]
+    ax.legend()
+
+    # Trails in bounded memory: the simplified orbits, the last trail_length positions for the tails
+    history = TrailBuffer(trail_length or 1, len(labels))
+    first = None  # Positions of the first frame, the tails of whole orbits
+    decimated = None  # Created with the first limits, which set its tolerance
+    limits = None
+    frame = -1
+
+    def fit(points):
+        nonlocal decimated, limits
+        low, high = np.min(points), np.max(points)
+        if limits is None:
+            low, high = low - 0.1, high + 0.1  # The margin of bodies_scene
+            decimated = DecimatedTrail(len(labels), (lod or 0.0) * (high - low) / min(ax.bbox.width, ax.bbox.height))
+        elif low < limits[0] or high > limits[1]:
+            # A body left the axes: widen them with room to spare, so that they rarely change
+            low, high = min(low, limits[0]), max(high, limits[1])
+            low, high = low - 0.25 * (high - low), high + 0.25 * (high - low)
+        else:
+            return
+        limits = low, high
+        ax.set_xlim(low, high)
+        ax.set_ylim(low, high)
+        ax.set_zlim(low, high)
+
+    def animate(positions):
+        nonlocal first, frame
+        frame += 1
+        if first is None:
+            first = np.array(positions)
+        history.append(positions)
+
+        # The trail of frame f runs from point f - trail_length + 1 to point f, as in bodies_scene
+        start = 0 if trail_length is None else max(frame + 1 - trail_length, 0)
+        decimated.append(positions, start)
+        _set_trails(lines, stars, *decimated.view(first if trail_length is None else history.view()[0]))
+        return lines + stars
+
+    return animate, fit
+
+
+def _stream_bodies(chunks, scene_args, filename, dpi, sink_options, fps, blit, still_tolerance):
+    """
+    Function to draw and save frames as their positions arrive, see animate_bodies
+    :param chunks: Iterator of position arrays of shape (frames, N, 3)
+    :param scene_args: Arguments of streamed_bodies_scene after the figure
+    :param still_tolerance: Movement below this fraction of the extent seen so far counts as still
+    """
+    from collections import deque
+    from nbody.frames import agg_figure, frame_grabber
+
+    fig = agg_figure(BODIES_FIGSIZE, dpi)
+    animate, fit = streamed_bodies_scene(fig, *scene_args)
+    grab = frame_grabber(fig, blit)
+    trail_length = scene_args[3]
+
+    # As merge_still_frames: a frame is drawn when a body or the tail of its trail moved visibly since the last
+    # drawn frame, otherwise that frame is held longer. Its hold is known only once a later frame moves, so the
+    # last drawn frame waits here (a copy: the canvas is drawn over by the next frame)
+    recent = deque(maxlen=trail_length or 1)  # Positions back to the tails of the trails
+    low, high = np.inf, -np.inf
+    pending, hold, shown = None, 0, None
+    start_time = time.time()
+    count = 0
+    with open_sink(filename, fps=fps, **(sink_options or {})) as sink:
+        for chunk in chunks:
+            fit(chunk)
+            low, high = min(low, np.min(chunk)), max(high, np.max(chunk))
+            for positions in chunk:
+                artists = animate(positions)  # Every frame advances the trails, drawn or not
+                recent.append(positions)
+                points = np.stack((positions, recent[0])) if trail_length else positions
+                if shown is not None and np.abs(points - shown).max() <= still_tolerance * (high - low):
+                    hold += 1
+                    continue
+                if pending is not None:
+                    sink.write(pending, hold)
+                pending, hold, shown = np.array(grab(artists)), 1, points
+                count += 1
+                if count == 1:
+                    print(f"First frame drawn after {time.time() - start_time:.2f} seconds")
+                print(f"Saving frame {count} - Elapsed Time: {time.time() - start_time:.2f} seconds", end="\r")
+        if pending is not None:
+            sink.write(pending, hold)
+    print(f"\nAnimation Saved Successfully ({count} frames)!")
+
+
+def animate_bodies(trajectories, labels, colors, title, filename, total_frames=None, dpi=100, show=True,
+                   trail_length=None, workers=1, sink_options=None, fps=24, still_tolerance=STILL_TOLERANCE,
+                   blit=False, lod=None, preview=None):
+    """
+    Function to animate and save the orbits of an N-body system
+    :param trajectories: Positions of each body over time, list of (T, 3) arrays or array (T, N, 3); or an
+                         iterator of chunks of frames, arrays of shape (frames, N, 3), drawn and saved as they arrive
+                         (e.g. from nbody.planner.resample_chunks; one frame per position, no interactive window,
+                         and total_frames, workers and preview do not apply). Memory then stays bounded by the
+                         chunk size only for video output: Pillow keeps every frame of a GIF until it is closed
+    :param labels: Legend label of each body
+    :param colors: Colour of each body
+    :param title: Title of the plot
+    :param filename: Output file: .gif, or a video (.mp4, .webm, ...) encoded by ffmpeg
+    :param total_frames: Number of frames to save (default: the empty first frame, then one per time point, so
+                         that frame i shows point i - 1 and the last frame the last point)
+    :param dpi: Resolution of the saved frames
+    :param show: Open the interactive window afterwards
+    :param trail_length: Number of past points drawn behind each body (None for the whole orbit)
+    :param workers: Processes drawing the saved frames (None for one per CPU)
+    :param sink_options: Options of the output sink, e.g. dict(codec="libx265", crf=28) for videos
+    :param fps: Frames per second of the saved animation (see nbody.planner to resample the trajectories to it)
+    :param still_tolerance: Frames whose bodies moved less than this fraction of the plot extent are not drawn
+                            again: the previous frame stays on screen longer (0 to draw every frame)
+    :param blit: Cache the axes and labels as a background and draw only the orbits and stars on every frame
+    :param lod: Simplify the orbits to about this many pixels, e.g. 1 (None to draw every point)
+    :param preview: Save only a few small frames to filename instead of the animation, for a quick look: options
+                    of nbody.planner.preview_frames, e.g. dict(step=40) or dict(first=0, last=300, count=12)
+                    ({} for the defaults); filename is then a .png contact sheet or a short .gif
+    :return: FuncAnimation of the interactive window (None for previews)
+    """
+    if isinstance(trajectories, Iterator):
+        _stream_bodies(trajectories, (labels, colors, title, trail_length, lod), filename, dpi, sink_options, fps,
+                       blit, still_tolerance)
+        return None
+
+    plt, animation = _matplotlib()
+    trajectories = [np.asarray(traj) for traj in np.swapaxes(trajectories, 0, 1)] \
+        if isinstance(trajectories, np.ndarray) else list(trajectories)
+    if total_frames is None:
+        total_frames = len(trajectories[0]) + 1
+    scene_args = (trajectories, labels, colors, title, trail_length, lod)
+    if preview is not None:
+        _save_preview(bodies_scene, scene_args, total_frames, BODIES_FIGSIZE, filename, preview, workers, fps)
+        return None
+
+    # Frame i shows every body at point i - 1 and its trail back to point i - trail_length; frames that look the
+    # same as the one before them are not drawn, the sink holds that one longer (frame 0 is empty, always drawn)
+    i = np.arange(1, total_frames)
+    shown = np.minimum(i, len(trajectories[0])) - 1
+    tails = shown if trail_length is None else np.minimum(np.maximum(i - trail_length, 0), shown)
+    points = np.stack([traj[index] for index in (shown, tails) for traj in trajectories], axis=1)
+    draw, holds = merge_still_frames(points, np.ones(len(points), dtype=int), still_tolerance)
+    draw, holds = np.concatenate(([0], draw + 1)), np.concatenate(([1], holds))
+
+    # Save the animation with progress indicator (frames are drawn off-screen and encoded alongside)
+    with open_sink(filename, fps=fps, **(sink_options or {})) as sink:
+        frames = render_frames(bodies_scene, scene_args, total_frames, BODIES_FIGSIZE, dpi, workers,
+                               prepare=sink.prepare, draw=draw, blit=blit)
+        for i, (frame, hold) in enumerate(zip(frames, holds)):
+            sink.write(frame, hold)
+
+            # Update the progress indicator
+            print(f"Saving frame {i+1}/{len(draw)} - {((i+1)/len(draw))*100:.2f}% complete", end="\r")
+
+    print("Animation Saved Successfully!")
+
+    # Create figure and animation for the interactive window (after the worker processes are done: forking
+    # once a GUI figure exists is unsafe on some platforms)
+    fig = plt.figure(figsize=BODIES_FIGSIZE)
+    animate, init = bodies_scene(fig, *scene_args)
+    ani = animation.FuncAnimation(fig, animate, frames=total_frames, interval=20, blit=True, init_func=init)
+
+    # Display the animation
+    if show:
+        plt.show()
+    return ani
+
+
+def _save_preview(scene, scene_args, total_frames, figsize, filename, preview, workers, fps):
+    """
+    Function to save a preview of an animation: a few frames at PREVIEW_WIDTH
+    :param preview: Options of nbody.planner.preview_frames
+    """
+    draw = preview_frames(total_frames, **preview)
+    holds = np.diff(np.append(draw, total_frames))  # A short GIF runs as long as the full animation
+    with open_sink(filename, fps=fps) as sink:
+        frames = render_frames(scene, scene_args, total_frames, figsize, PREVIEW_WIDTH / figsize[0], workers,
+                               prepare=sink.prepare, draw=draw)
+        for i, (frame, hold) in enumerate(zip(frames, holds)):
+            sink.write(frame, hold)
+            print(f"Preview frame {i+1}/{len(draw)}", end="\r")
+    print(f"Preview of {len(draw)} frames saved to {filename}")
+
+
+def solar_system_frames(bodies):
+    """
+    Function to find the number of frames of one orbit of each body (its orbital period in days)
+    :param bodies: Catalog, see animate_solar_system
+    :return: Integer array, shape (bodies,)
+    """
+    return bodies["period"].astype(int)
+
+
+def solar_system_scene(fig, bodies, skip_factor, trail_length=None, resolution=EPHEMERIS_RESOLUTION,
+                       cache_dir=EPHEMERIS_CACHE, frames=None, co_moving=False, projected=False, view=None,
+                       depth_sizing=0.0, lod=None):
+    """
+    Function to draw the bodies of a catalog orbiting a drifting Sun onto a figure
+    :param fig: Figure
+    :param bodies: Catalog, see animate_solar_system
+    :param skip_factor: Simulated days advanced per frame (need not be whole)
+    :param trail_length: Number of past frames drawn behind each body (None for the whole run)
+    :param resolution: Ephemeris table entries per orbit
+    :param cache_dir: Directory caching the ephemeris tables (None to always rebuild them)
+    :param frames: Number of frames saved (default: one orbit of the slowest body), sizes the whole-run trail
+    :param co_moving: Draw in the Sun's frame: the axes stay fixed instead of following the Sun
+    :param projected: Project all orbits and bodies in one NumPy pass per frame and draw them as 2D artists
+                      (see nbody.projection) instead of mplot3d artists
+    :param view: Tuple (elevation, azimuth) of the camera in degrees (default: Matplotlib's)
+    :param depth_sizing: Projected only: relative growth of the nearest markers over the farthest (0 for fixed sizes)
+    :param lod: Simplify the orbits to about this many pixels (see DecimatedTrail; None to draw every point)
+    :return: Tuple (animate, None): animate(i) draws frame i
+    """
+    from matplotlib.colors import to_rgba_array
+    from matplotlib.lines import Line2D  # Legend entries
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection  # One artist for every orbit path
+    from nbody.projection import Camera, FlatLineCollection, flat_markers
+
+    # Number of frames for each orbit (proportional to its orbital period)
+    planet_frames = solar_system_frames(bodies)
+    a_outer = bodies["a"].max()
+
+    # Calculate total frames: one orbit of the slowest body unless planned (the interactive window runs twice as long)
+    total_frames = int(planet_frames.max()) if frames is None else frames
+
+    # One-orbit ephemeris table of every body (cached on disk), looked up by phase at each frame
+    table = load_table(bodies["e"], resolution=resolution, cache_dir=cache_dir)
+
+    # Set up the plot
+    ax = fig.add_subplot(111, projection='3d')
+    style_axes(fig, ax, "A Cosmic Waltz: Planets Dancing in the Solar System\n")
+    if view is not None:
+        ax.view_init(*view)
+
+    # Paths of the orbits and markers of the bodies, the Sun first: one artist each for the whole catalog
+    colors = ["orange"] + list(bodies["color"])
+    linewidths = [1.5] + [2] * len(bodies)
+    sizes = np.array([10 ** 2] + [4 ** 2] * len(bodies), dtype=float)
+    positions = np.zeros((len(bodies) + 1, 3))
+    if projected:
+        paths = FlatLineCollection(colors, linewidths)
+        ax.add_collection(paths, autolim=False)
+        markers = flat_markers(ax, colors, sizes)
+        rgba = to_rgba_array(colors)
+    else:
+        paths = Line3DCollection([], colors=colors, linewidths=linewidths)
+        ax.add_collection(paths)
+        markers = ax.scatter(*positions.T, c=colors, s=sizes, depthshade=False)
+
+    # Ring buffer storing the orbit history (the Sun first, then every body)
+    trail = TrailBuffer(2 * total_frames if trail_length is None else trail_length, len(bodies) + 1)
+
+    # Simplified orbits: lod pixels in data units, from the axes extent over its size on screen
+    decimated = None
+    if lod is not None:
+        decimated = DecimatedTrail(len(bodies) + 1, lod * a_outer / min(ax.bbox.width, ax.bbox.height))
+
+    # In the Sun's frame the viewing limits never change: set them once
+    if co_moving:
+        ax.set_xlim(-0.5 * a_outer, 0.5 * a_outer)
+        ax.set_ylim(-0.5 * a_outer, 0.5 * a_outer)
+        ax.set_zlim(-0.5 * a_outer, 0.5 * a_outer)
+    camera = Camera(ax) if projected else None
+
+    # Animation function (called repeatedly)
+    def animate(i):
+
+        # Calculate the frame index considering the skip factor
+        frame_index = i * skip_factor
+
+        # Sun's motion (straight line in 3D)
+        x_sun = frame_index * 1e9  # Sun moves along the X-axis
+        y_sun = 0  # Sun remains fixed at y = 0
+        z_sun = 0  # Sun remains fixed at z = 0
+
+        # Every body at its phase (orbits completed), moving along with the Sun
+        positions[0] = x_sun, y_sun, z_sun
+        np.add(interpolate(table, frame_index / planet_frames, bodies["a"]), positions[0], out=positions[1:])
+
+        # Store positions for the orbit paths (restarting whenever the animation does)
+        if i == 0:
+            trail.reset()
+        trail.append(positions)
+        segments = trail.view().swapaxes(0, 1)  # (bodies, length, 3) view
+        lengths = None
+        if decimated is not None:
+            # All simplified orbits one after another, starting at the oldest point of the full ones
+            if i == 0:
+                decimated.reset()
+            decimated.append(positions, i - len(trail) + 1)
+            segments, lengths = decimated.view(segments[:, 0])
+
+        if co_moving:
+            # Shift everything, the trails too, by the Sun's current position: the picture inside the axes is
+            # the same as when the axes follow the Sun
+            shown, segments = positions - positions[0], segments - positions[0]
+        else:
+            shown = positions
+
+            # Set the viewing limits
+            ax.set_xlim(-0.5 * a_outer + x_sun, 0.5 * a_outer + x_sun)
+            ax.set_ylim(-0.5 * a_outer, 0.5 * a_outer + y_sun)
+            ax.set_zlim(-0.5 * a_outer, 0.5 * a_outer + z_sun)
+            if projected:
+                camera.update()
+
+        if projected:
+            # Every trail point, then every body, through the camera at once; markers drawn farthest first
+            xy, depth = camera.project(segments)
+            paths.set_polylines(xy, lengths)
+            paths.depth = depth.min()
+            xy, depth = camera.project(shown)
+            order = np.argsort(depth)[::-1]
+            markers.set_offsets(xy[order])
+            markers.set_sizes(sizes[order] * camera.depth_scale(depth[order], depth_sizing))
+            markers.set_color(rgba[order])
+            markers.depth = depth.min()
+        else:
+            markers._offsets3d = tuple(shown.T)
+            paths.set_segments(segments if lengths is None else np.split(segments, np.cumsum(lengths)[:-1]))
+        markers.stale = True
+
+        return [paths, markers]
+
+    animate.decimated = decimated
+
+    # Add the legend
+    handles = [Line2D([], [], color=color, linewidth=2) for color in colors[:MAX_LEGEND_ENTRIES]]
+    ax.legend(handles, ["Sun"] + list(bodies["name"][:MAX_LEGEND_ENTRIES - 1]),
+              loc="upper left", fontsize=14, bbox_to_anchor=(-0.2, 1))
+
+    return animate, None
+
+
+def animate_solar_system(bodies, skip_factor, filename, dpi=200, show=True, trail_length=None,
+                         resolution=EPHEMERIS_RESOLUTION, cache_dir=EPHEMERIS_CACHE, workers=1, sink_options=None,
+                         duration=None, fps=24, blit=False, co_moving=False, projected=False, view=None,
+                         depth_sizing=0.0, lod=None, preview=None):
+    """
+    Function to animate and save the bodies of a catalog orbiting a drifting Sun
+    :param bodies: Catalog, structured array with the columns of nbody.catalog.CATALOG_DTYPE
+                   (a in meters, period in days)
+    :param skip_factor: Simulated days advanced per frame
+    :param filename: Output file: .gif, or a video (.mp4, .webm, ...) encoded by ffmpeg
+    :param dpi: Resolution of the saved frames
+    :param show: Open the interactive window afterwards
+    :param trail_length: Number of past frames drawn behind each body (None for the whole run)
+    :param resolution: Ephemeris table entries per orbit
+    :param cache_dir: Directory caching the ephemeris tables (None to always rebuild them)
+    :param workers: Processes drawing the saved frames (None for one per CPU)
+    :param sink_options: Options of the output sink, e.g. dict(codec="libx265", crf=28) for videos
+    :param duration: Seconds of animation: the same simulated days are spread over duration * fps frames
+                     (default: one frame per skip_factor days)
+    :param fps: Frames per second of the saved animation
+    :param blit: Draw only the orbits and bodies over a cached background (redrawn whenever the axes pan,
+                 so use it with co_moving)
+    :param co_moving: Draw in the Sun's frame with fixed axes (x is then measured from the Sun)
+    :param projected: Project all orbits and bodies with NumPy and draw them as 2D artists (faster for large catalogs)
+    :param view: Tuple (elevation, azimuth) of the camera in degrees (default: Matplotlib's)
+    :param depth_sizing: Projected only: relative growth of the nearest markers over the farthest (0 for fixed sizes)
+    :param lod: Simplify the orbits to about this many pixels, e.g. 1 (None to draw every point)
+    :param preview: Save only a few small frames to filename instead of the animation, see animate_bodies
+    :return: FuncAnimation of the interactive window (None for previews)
+    """
+    plt, animation = _matplotlib()
+    total_frames = int(solar_system_frames(bodies).max())
+    if duration is not None:
+        plan = plan_frames(0, (total_frames - 1) * skip_factor, duration, fps)
+        total_frames = len(plan.times)
+        skip_factor = plan.times[1]  # Evenly spaced: the days advanced per frame
+    scene_args = (bodies, skip_factor, trail_length, resolution, cache_dir, total_frames, co_moving, projected, view,
+                  depth_sizing, lod)
+    if preview is not None:
+        _save_preview(solar_system_scene, scene_args, total_frames, plt.rcParams["figure.figsize"], filename,
+                      preview, workers, fps)
+        return None
+
+    start_time = time.time()
+    elapsed_time = 0.0
+
+    # Save the animation with progress indicator (frames are drawn off-screen and encoded alongside)
+    figsize = plt.rcParams["figure.figsize"]
+    with open_sink(filename, fps=fps, **(sink_options or {})) as sink:
+        for i, frame in enumerate(render_frames(solar_system_scene, scene_args, total_frames, figsize, dpi, workers,
+                                                prepare=sink.prepare, blit=blit)):
+            sink.write(frame)
+            completion = (i+1) / total_frames * 100
+            elapsed_time = time.time() - start_time
+            print(f"Saving frame {i+1}/{total_frames} - Completion: {completion:.2f}% - Elapsed Time: {elapsed_time:.2f} seconds", end="\r")
+    elapsed_time = time.time() - start_time
+
+    print(f"\nAnimation Saved Successfully in {elapsed_time:.2f} seconds!")
+
+    # Create and run the animation with increased frames (after the worker processes are done, see animate_bodies)
+    fig = plt.figure()
+    animate, _ = solar_system_scene(fig, *scene_args)
+    ani = animation.FuncAnimation(fig, animate, frames=2 * total_frames, interval=30, blit=True)
+
+    if show:
+        plt.show()
+    return ani
@@ -0,0 +1,49 @@
+# Initial Conditions of the scripted systems, importable without plotting
+
+import numpy as np  # For numerical calculations
+
+# Masses (m1, m2, ...), positions (r1, ...) and velocities (v1, ...) of each script's bodies.
+# "com_drift" marks the systems whose dr/dt subtracts the centre-of-mass velocity.
+SCENARIOS = {
+    "2body": {
+        "m1": 1.1, "m2": 0.907,  # Alpha Centauri A and B
+        "r1": [-0.5, 0, 0], "r2": [0.5, 0, 0],
+        "v1": [0.01, 0.01, 0], "v2": [-0.05, 0, -0.1],
+        "com_drift": False,
+    },
+    "3body": {
+        "m1": 1.1, "m2": 0.907, "m3": 1,  # Alpha Centauri A and B, third star
+        "r1": [-0.5, 0, 0], "r2": [0.5, 0, 0], "r3": [0, 0, 1],
+        "v1": [0.01, 0.01, 0], "v2": [-0.05, 0, -0.1], "v3": [0, -0.01, 0],
+        "com_drift": True,
+    },
+    "3body_with_earth": {
+        "m1": 1.1, "m2": 0.907, "m3": 1, "m4": 0.003,  # Three stars and an Earth-like planet
+        "r1": [-1.0, 0, 0], "r2": [1.0, 0, 0], "r3": [0, 0.5, 0.5], "r4": [0, 0, 0],
+        "v1": [0.2, 0.15, 0.05], "v2": [-0.1, -0.2, 0.1], "v3": [0.1, 0.0, -0.1], "v4": [0, 0.08, 0.1],
+        "com_drift": True,
+    },
+}
+
+
+def initial_conditions(name, **overrides):
+    """
+    Function to assemble the initial conditions of a scenario
+    :param name: Key of SCENARIOS ("2body", "3body" or "3body_with_earth")
+    :param overrides: Replacement values for any of the scenario's m*, r*, v* entries
+    :return: Tuple (masses, r, v, v_com); r and v have shape (N, 3), v_com is None without COM drift
+    """
+    params = dict(SCENARIOS[name])
+    unknown = set(overrides) - set(params)
+    if unknown:
+        raise KeyError(f"Unknown parameters for {name}: {sorted(unknown)}")
+    params.update(overrides)
+
+    n = sum(1 for key in params if key.startswith("m"))
+    masses = np.array([params[f"m{k}"] for k in range(1, n + 1)], dtype="float64")
+    r = np.array([params[f"r{k}"] for k in range(1, n + 1)], dtype="float64")
+    v = np.array([params[f"v{k}"] for k in range(1, n + 1)], dtype="float64")
+
+    # Find velocity of the Centre of Mass
+    v_com = (masses[:, np.newaxis] * v).sum(axis=0) / masses.sum() if params["com_drift"] else None
+    return masses, r, v, v_com
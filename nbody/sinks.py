@@ -0,0 +1,303 @@
+# Frame sinks: encoding rendered frames on a background thread while the next frame is drawn
+
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+
+import numpy as np  # For numerical calculations
+
+# Default video codec of each container written through ffmpeg
+VIDEO_CODECS = {".mp4": "libx264", ".mkv": "libx264", ".mov": "libx264", ".webm": "libvpx-vp9"}
+
+
+def to_palette(rgba):
+    """
+    Function to convert an RGBA frame to a GIF frame
+    :param rgba: Array of shape (height, width, 4), dtype uint8 (a view of the canvas is fine)
+    :return: Palette image, quantized as Pillow's GIF encoder would quantize matplotlib's PillowWriter frames
+    """
+    from PIL import Image
+    image = Image.fromarray(rgba)
+    if image.getextrema()[3][0] == 255:
+        image = image.convert("RGB")  # Opaque frames quantize better from RGB (as in matplotlib's PillowWriter)
+    return image.convert("P", palette=Image.Palette.ADAPTIVE)
+
+
+class GifSink:
+    """
+    Frame sink writing a looping GIF from a background encoder thread
+
+    write() hands a frame over and returns at once, so the caller draws frame
+    i + 1 while frame i is quantized and encoded. The canvas reuses its pixel
+    buffer for the next draw, so an RGBA view is copied once into one of a few
+    recycled slots; the bounded queue stops the drawing from running ahead.
+    A frame held for several intervals is stored once with a longer duration.
+    """
+
+    # Conversion done by worker processes before their frames reach the sink
+    prepare = staticmethod(to_palette)
+
+    def __init__(self, filename, fps=24, buffers=4):
+        """
+        Function to start the encoder thread
+        :param filename: Output GIF
+        :param fps: Frames per second
+        :param buffers: Frames waiting to be encoded before write() blocks
+        """
+        self.filename = filename
+        self.fps = fps
+        self.buffers = buffers
+        self._queue = queue.Queue(maxsize=buffers)
+        self._free = queue.Queue()  # Slots the encoder is done with
+        self._slots = 0
+        self._error = None
+        self._finished = False  # The encoder has taken the end-of-stream marker
+        self._thread = threading.Thread(target=self._encode, daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def write(self, frame, hold=1):
+        """
+        Function to queue one frame
+        :param frame: RGBA array of shape (height, width, 4), or an image already converted with to_palette
+        :param hold: Number of frame intervals (1 / fps) the frame stays on screen
+        """
+        if self._error is not None:
+            raise RuntimeError(f"Encoding {self.filename} failed") from self._error
+        if isinstance(frame, np.ndarray):
+            if self._slots < self.buffers:
+                slot = np.empty_like(frame)
+                self._slots += 1
+            else:
+                slot = self._free.get()
+            np.copyto(slot, frame)
+            frame = slot
+        self._queue.put((frame, hold))
+
+    def close(self):
+        """
+        Function to flush the queued frames and finish the file
+        """
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        if self._error is not None:
+            raise RuntimeError(f"Encoding {self.filename} failed") from self._error
+
+    def _frames(self):
+        """
+        Function to take the queued frames in order until close() is called
+        :return: Generator of palette images, each with its own duration
+        """
+        while (item := self._queue.get()) is not None:
+            frame, hold = item
+            if isinstance(frame, np.ndarray):
+                image = to_palette(frame)
+                self._free.put(frame)
+                frame = image
+            frame.info["duration"] = hold * int(1000 / self.fps)  # Pillow takes each frame's duration from its info
+            yield frame
+        self._finished = True
+
+    def _encode(self):
+        """
+        Function run by the encoder thread: Pillow pulls the frames from the queue as it writes the GIF
+        """
+        frames = self._frames()
+        try:
+            first = next(frames, None)
+            if first is not None:
+                first.save(self.filename, save_all=True, append_images=frames, loop=0)
+        except Exception as exc:  # Reported by the next write() or close()
+            self._error = exc
+            while not self._finished:  # Keep draining so write() never blocks
+                item = self._queue.get()
+                self._finished = item is None
+                if item is not None and isinstance(item[0], np.ndarray):
+                    self._free.put(item[0])
+
+
+class FFmpegSink:
+    """
+    Frame sink streaming raw RGBA frames over a pipe to an ffmpeg process
+
+    ffmpeg encodes in its own process, so write() only copies the canvas
+    pixels into the pipe and the drawing of the next frame overlaps encoding.
+    """
+
+    prepare = staticmethod(np.array)  # Workers send plain RGBA arrays
+
+    def __init__(self, filename, fps=24, codec=None, crf=23, pix_fmt="yuv420p", extra_args=(), ffmpeg="ffmpeg"):
+        """
+        Function to prepare the encoder (ffmpeg starts with the first frame, once the frame size is known)
+        :param filename: Output video; the container follows the extension (.mp4, .webm, .mkv, .mov)
+        :param fps: Frames per second
+        :param codec: ffmpeg video encoder (default: VIDEO_CODECS for the extension)
+        :param crf: Constant rate factor: lower is better quality and larger files (None for the codec default)
+        :param pix_fmt: Pixel format of the video (yuv420p plays everywhere)
+        :param extra_args: More ffmpeg output options, e.g. ("-preset", "veryslow")
+        :param ffmpeg: Name or path of the ffmpeg binary
+        """
+        self.filename = filename
+        self.fps = fps
+        self.codec = codec or VIDEO_CODECS.get(os.path.splitext(filename)[1].lower(), "libx264")
+        self.crf = crf
+        self.pix_fmt = pix_fmt
+        self.extra_args = list(extra_args)
+        self.ffmpeg = shutil.which(ffmpeg)
+        if self.ffmpeg is None:
+            raise RuntimeError(f"{ffmpeg} was not found: install ffmpeg or save a .gif instead")
+        self._process = None
+        self._log = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def command(self, width, height):
+        """
+        Function to build the ffmpeg command line
+        :param width: Frame width in pixels
+        :param height: Frame height in pixels
+        :return: List of arguments
+        """
+        command = [self.ffmpeg, "-y", "-loglevel", "error",
+                   "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", str(self.fps), "-i", "-",
+                   "-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2",  # Chroma subsampling needs even sizes
+                   "-c:v", self.codec, "-pix_fmt", self.pix_fmt]
+        if self.crf is not None:
+            command += ["-crf", str(self.crf)]
+            if self.codec.startswith("libvpx"):
+                command += ["-b:v", "0"]  # Constant quality rather than a bitrate cap
+        return command + self.extra_args + [self.filename]
+
+    def write(self, frame, hold=1):
+        """
+        Function to send one frame to ffmpeg
+        :param frame: RGBA array of shape (height, width, 4), dtype uint8 (a view of the canvas is fine)
+        :param hold: Number of frame intervals (1 / fps) the frame stays on screen (a video repeats it)
+        """
+        if self._process is None:
+            height, width = frame.shape[:2]
+            self._log = tempfile.TemporaryFile()
+            self._process = subprocess.Popen(self.command(width, height), stdin=subprocess.PIPE, stderr=self._log)
+        try:
+            data = memoryview(np.ascontiguousarray(frame)).cast("B")
+            for _ in range(hold):
+                self._process.stdin.write(data)
+        except BrokenPipeError:
+            self._process.wait()
+            raise RuntimeError(f"ffmpeg stopped while writing {self.filename}: {self._errors()}") from None
+
+    def close(self):
+        """
+        Function to flush the frames and wait for ffmpeg to finish the file
+        """
+        if self._process is None:
+            return
+        process, self._process = self._process, None
+        try:
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        if process.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed writing {self.filename}: {self._errors()}")
+        self._log.close()
+
+    def _errors(self):
+        """
+        Function to read what ffmpeg printed
+        """
+        self._log.seek(0)
+        return self._log.read().decode(errors="replace").strip()
+
+
+class ContactSheetSink:
+    """
+    Frame sink tiling the frames into a grid of thumbnails saved as one PNG
+
+    Meant for previews: a few low-resolution frames side by side show whether
+    the orbits behave without encoding a whole animation. Frames are kept in
+    memory until close(), in the order written (row by row); holds are ignored.
+    """
+
+    # Worker processes send plain RGBA copies of their canvas
+    prepare = staticmethod(np.array)
+
+    def __init__(self, filename, fps=24, columns=None, gap=4, gap_color=(64, 64, 64, 255)):
+        """
+        Function to start a contact sheet
+        :param filename: Output PNG
+        :param fps: Unused (the sheet is a still image)
+        :param columns: Thumbnails per row (default: about a square grid)
+        :param gap: Pixels between the thumbnails
+        :param gap_color: RGBA colour between the thumbnails
+        """
+        self.filename = filename
+        self.columns = columns
+        self.gap = gap
+        self.gap_color = gap_color
+        self._frames = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def write(self, frame, hold=1):
+        """
+        Function to add one thumbnail
+        :param frame: RGBA array of shape (height, width, 4) (a view of the canvas is fine)
+        :param hold: Unused
+        """
+        self._frames.append(np.array(frame))
+
+    def close(self):
+        """
+        Function to tile the thumbnails and save the sheet
+        """
+        from PIL import Image
+        if not self._frames:
+            return
+        columns = self.columns or int(np.ceil(np.sqrt(len(self._frames))))
+        rows = -(-len(self._frames) // columns)
+        height, width = self._frames[0].shape[:2]
+        sheet = np.empty((rows * (height + self.gap) + self.gap, columns * (width + self.gap) + self.gap, 4),
+                         dtype=np.uint8)
+        sheet[:] = self.gap_color
+        for k, frame in enumerate(self._frames):
+            top = self.gap + (k // columns) * (height + self.gap)
+            left = self.gap + (k % columns) * (width + self.gap)
+            sheet[top:top + height, left:left + width] = frame
+        Image.fromarray(sheet).save(self.filename)
+        self._frames = []
+
+
+def open_sink(filename, fps=24, **options):
+    """
+    Function to pick the frame sink from the output filename
+    :param filename: Output file: .gif is written with Pillow, video containers (see VIDEO_CODECS) with ffmpeg,
+                     .png as a contact sheet of the frames
+    :param fps: Frames per second
+    :param options: Options of the sink (see GifSink, FFmpegSink and ContactSheetSink)
+    :return: GifSink, FFmpegSink or ContactSheetSink
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".gif":
+        return GifSink(filename, fps=fps, **options)
+    if extension == ".png":
+        return ContactSheetSink(filename, fps=fps, **options)
+    if extension in VIDEO_CODECS:
+        return FFmpegSink(filename, fps=fps, **options)
+    raise ValueError(f"Unknown output format '{extension}': use .gif, .png or one of {', '.join(VIDEO_CODECS)}")
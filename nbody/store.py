@@ -0,0 +1,273 @@
+# Trajectory store: solutions too long for RAM, appended in chunks to a memory-mapped file
+#
+# The file is a small header followed by the states row after row, exactly as
+# solve() lays them out ([r1, ..., rN, v1, ..., vN] per output time):
+#
+#   NBODYTRJ1 {"bodies": N, "dtype": "<f8", "t0": ..., "dt": ..., "K1": ..., "K2": ..., "steps": T}   (4 KiB)
+#   T rows of 6N values
+#
+# The writer grows the file as chunks arrive and records the number of
+# finished rows in the header whenever it flushes. The reader maps the rows
+# without loading them: time slices, positions and single bodies are views.
+# With checkpoints (nbody/checkpoint.py), an interrupted solve_to_store picks
+# up the store where the last checkpoint left it.
+
+import json
+import os
+
+import numpy as np  # For numerical calculations
+
+# First bytes of every store and size of the header before the rows
+STORE_MAGIC = b"NBODYTRJ1 "
+HEADER_BYTES = 4096
+
+# Rows allocated when a writer starts (the file doubles whenever it runs out)
+STORE_CAPACITY = 1024
+
+
+def read_header(path):
+    """
+    Function to read the header of a store
+    :param path: Store file
+    :return: Dictionary with bodies, dtype, t0, dt, K1, K2 and steps
+    """
+    with open(path, "rb") as f:
+        head = f.read(HEADER_BYTES)
+    if not head.startswith(STORE_MAGIC):
+        raise ValueError(f"{path} is not a trajectory store")
+    return json.loads(head[len(STORE_MAGIC):])
+
+
+class TrajectoryWriter:
+    """
+    Writer appending states to a trajectory store
+
+    The rows go straight into a memory map of the file, so the operating
+    system writes them back as memory runs short: a run of any length needs
+    only one chunk in RAM. Use as a context manager, or call close().
+    """
+
+    def __init__(self, path, bodies, dt, K1, K2, t0=0.0, dtype="float64", capacity=STORE_CAPACITY):
+        """
+        Function to create a store (an existing file is overwritten)
+        :param path: Store file
+        :param bodies: Number of bodies N
+        :param dt: Time between two rows
+        :param K1: Normalized gravitational constant of the run
+        :param K2: Normalized velocity-to-position constant of the run
+        :param t0: Time of the first row
+        :param dtype: Floating-point type of the stored values ("float32" halves the file)
+        :param capacity: Rows allocated up front
+        """
+        self.path = path
+        self.header = dict(bodies=int(bodies), dtype=np.dtype(dtype).newbyteorder("<").str, t0=float(t0),
+                           dt=float(dt), K1=float(K1), K2=float(K2), steps=0)
+        self.width = 6 * int(bodies)
+        self.steps = 0
+        self._file = open(path, "w+b")
+        self._rows = None
+        self._grow(max(int(capacity), 1))
+        self._write_header()
+
+    @classmethod
+    def reopen(cls, path, steps):
+        """
+        Function to continue writing a store after its first rows
+        :param path: Store file
+        :param steps: Rows kept (the rows after them are overwritten)
+        :return: TrajectoryWriter appending after row steps
+        """
+        writer = cls.__new__(cls)
+        writer.path = path
+        writer.header = read_header(path)
+        writer.width = 6 * writer.header["bodies"]
+        row_bytes = writer.width * np.dtype(writer.header["dtype"]).itemsize
+        available = (os.path.getsize(path) - HEADER_BYTES) // row_bytes
+        if available < steps:
+            raise ValueError(f"{path} holds {available} rows, fewer than the {steps} to keep")
+        writer.steps = int(steps)
+        writer._file = open(path, "r+b")
+        writer._rows = None
+        writer._grow(max(available, 1))
+        writer._write_header()
+        return writer
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def _grow(self, capacity):
+        """
+        Function to enlarge the file to capacity rows and map them
+        """
+        if self._rows is not None:
+            self._rows.flush()
+            self._rows = None  # Unmapped before the file changes size
+        dtype = np.dtype(self.header["dtype"])
+        self._file.truncate(HEADER_BYTES + capacity * self.width * dtype.itemsize)
+        self._rows = np.memmap(self._file, dtype=dtype, mode="r+", offset=HEADER_BYTES, shape=(capacity, self.width))
+
+    def _write_header(self):
+        """
+        Function to record the header (with the number of finished rows) at the start of the file
+        """
+        self.header["steps"] = self.steps
+        text = STORE_MAGIC + json.dumps(self.header).encode()
+        self._file.seek(0)
+        self._file.write(text.ljust(HEADER_BYTES - 1) + b"\n")
+        self._file.flush()
+
+    def append(self, states):
+        """
+        Function to add rows at the end of the store
+        :param states: States [r1, ..., rN, v1, ..., vN], shape (rows, 6N) or (6N,)
+        """
+        states = np.reshape(states, (-1, self.width))
+        end = self.steps + len(states)
+        if end > len(self._rows):
+            self._grow(max(2 * len(self._rows), end))
+        self._rows[self.steps:end] = states
+        self.steps = end
+
+    def flush(self):
+        """
+        Function to write the rows back to the file and record them in the header
+        """
+        self._rows.flush()
+        self._write_header()
+
+    def sync(self):
+        """
+        Function to make the operating system write the rows appended so far to the disk
+        (safe to call from another thread while rows are appended)
+        """
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        """
+        Function to finish the store: flush it and cut the unused rows off the file
+        """
+        if self._file.closed:
+            return
+        self.flush()
+        self._rows = None
+        self._file.truncate(HEADER_BYTES + self.steps * self.width * np.dtype(self.header["dtype"]).itemsize)
+        self._file.close()
+
+
+class TrajectoryStore:
+    """
+    Read-only view of a trajectory store
+
+    Behaves like the solution array solve() returns (len, slicing, np.asarray
+    and the NumPy functions built on it, e.g. nbody.planner.split_solution),
+    without reading the file up front. positions, velocities and body(i) are
+    views of the mapped rows, so only the pages actually used are read.
+    """
+
+    def __init__(self, path):
+        """
+        Function to open a store
+        :param path: Store file written by TrajectoryWriter
+        """
+        self.path = path
+        self.header = read_header(path)
+        self.bodies = self.header["bodies"]
+        self.t0, self.dt = self.header["t0"], self.header["dt"]
+        self.K1, self.K2 = self.header["K1"], self.header["K2"]
+        shape = (self.header["steps"], 6 * self.bodies)
+        dtype = np.dtype(self.header["dtype"])
+        if shape[0] == 0:
+            self.states = np.empty(shape, dtype=dtype)
+        else:
+            self.states = np.memmap(path, dtype=dtype, mode="r", offset=HEADER_BYTES, shape=shape)
+
+    def __len__(self):
+        return len(self.states)
+
+    def __getitem__(self, index):
+        return self.states[index]
+
+    def __array__(self, dtype=None, copy=None):
+        return self.states if dtype is None else self.states.astype(dtype)
+
+    @property
+    def shape(self):
+        return self.states.shape
+
+    @property
+    def times(self):
+        """
+        Time of every row, shape (T,)
+        """
+        return self.t0 + self.dt * np.arange(len(self.states))
+
+    @property
+    def positions(self):
+        """
+        Positions of every body over time, a view of shape (T, N, 3)
+        """
+        return self.states.reshape(len(self.states), 2, self.bodies, 3)[:, 0]
+
+    @property
+    def velocities(self):
+        """
+        Velocities of every body over time, a view of shape (T, N, 3)
+        """
+        return self.states.reshape(len(self.states), 2, self.bodies, 3)[:, 1]
+
+    def body(self, index):
+        """
+        Function to get the positions of one body
+        :param index: Body index
+        :return: View of shape (T, 3)
+        """
+        return self.positions[:, index]
+
+
+def solve_to_store(path, init_params, time_span, masses, K1, K2, v_com=None, dtype="float64", checkpoint=None,
+                   resume=False, **settings):
+    """
+    Function to integrate a system straight into a trajectory store, a chunk at a time
+    :param path: Store file
+    :param dtype: Floating-point type of the stored values
+    :param checkpoint: nbody.checkpoint.Checkpointer saving the state of the run between chunks, or None
+    :param resume: Continue the run from checkpoint.path and the rows already in the store
+                   (the same inputs are required; the result is bit for bit that of an uninterrupted run)
+    :param settings: Integrator settings and chunk size of nbody.stream.solve_chunks (checkpoints fall between chunks)
+    (the other parameters are those of solve; time_span must be evenly spaced)
+    :return: TrajectoryStore of the run, usable wherever the solution array of solve is
+    """
+    from nbody.cache import trajectory_key
+    from nbody.stream import STREAM_CHUNK, ChunkSolver
+
+    time_span = np.asarray(time_span, dtype="float64")
+    dt = time_span[1] - time_span[0] if len(time_span) > 1 else 0.0
+    if not np.allclose(np.diff(time_span), dt):
+        raise ValueError("A trajectory store records evenly spaced times")
+    if resume and checkpoint is None:
+        raise ValueError("resume needs a checkpoint")
+    chunk = settings.pop("chunk", STREAM_CHUNK)
+    solver = ChunkSolver(init_params, time_span, masses, K1, K2, v_com, **settings)
+    key = trajectory_key(init_params, time_span, masses, K1, K2, v_com, **settings)
+    if resume:
+        snapshot = checkpoint.load()
+        if str(snapshot["key"]) != key:
+            raise ValueError(f"{checkpoint.path} is the checkpoint of a different run")
+        solver.restore(snapshot)
+        writer = TrajectoryWriter.reopen(path, solver.row)
+    else:
+        writer = TrajectoryWriter(path, np.size(masses), dt, K1, K2, t0=time_span[0], dtype=dtype)
+    with writer:
+        try:
+            for _, states in solver.chunks(chunk):
+                writer.append(states)
+                if checkpoint is not None and checkpoint.due(solver.time):
+                    # The rows reach the disk before the checkpoint that counts them
+                    checkpoint.save(dict(solver.snapshot(), key=key), solver.time, before=writer.sync)
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+    return TrajectoryStore(path)
@@ -0,0 +1,258 @@
+# Streaming: integrating a run a chunk of output times at a time, ahead of the code drawing it
+#
+# solve_chunks continues one integration from chunk to chunk, so the chunks
+# join into exactly the array solve() returns. prefetch runs such a generator
+# on a producer thread that stays a bounded number of chunks ahead: chunk
+# k + 1 is integrated while chunk k is drawn, the first frames appear as soon
+# as the first chunk is solved, and memory holds a few chunks however long the run.
+# ChunkSolver is the integration behind solve_chunks, with its state exposed
+# for checkpoints (see nbody/checkpoint.py).
+
+import queue
+import re
+import threading
+import warnings
+from functools import partial  # For fixing the Barnes-Hut opening angle
+
+import numpy as np  # For numerical calculations
+
+from nbody.barnes_hut import barnes_hut_accelerations, barnes_hut_derivatives
+from nbody.equations import nbody_accelerations, nbody_derivatives, nbody_jacobian
+from nbody.integrators import STEPS
+
+# Default output times per chunk and chunks integrated ahead of the consumer
+STREAM_CHUNK = 64
+STREAM_DEPTH = 2
+
+# Relative and absolute tolerance scipy.integrate.odeint uses by default
+ODEINT_TOLERANCE = 1.49012e-8
+
+
+# Arrays holding the state of scipy's LSODA between two calls, and the first scipy whose LSODA (C code) keeps
+# them all in Python: only there can a checkpoint restore LSODA bit for bit
+LSODA_STATE = ("rwork", "iwork", "state_doubles", "state_ints")
+LSODA_EXACT_SCIPY = (1, 15)
+
+
+def _lsoda_internals(solver):
+    """
+    Function to reach the LSODA behind a scipy.integrate.ode solver, to save or restore its state
+    :param solver: scipy.integrate.ode set to "lsoda"
+    :return: Tuple (scipy version, LSODA object with the LSODA_STATE arrays and call_args), or (version, None)
+             before LSODA_EXACT_SCIPY; a scipy from then on without those private attributes raises RuntimeError
+    """
+    import scipy
+
+    version = scipy.__version__
+    if tuple(int(part) for part in re.findall(r"\d+", version)[:2]) < LSODA_EXACT_SCIPY:
+        return version, None
+    lsoda = getattr(solver, "_integrator", None)
+    arrays = [getattr(lsoda, name, None) for name in LSODA_STATE]
+    call_args = getattr(lsoda, "call_args", None)
+    if not all(isinstance(array, np.ndarray) for array in arrays) or not isinstance(call_args, list) \
+            or len(call_args) != 7 or call_args[4] is not arrays[0] or call_args[5] is not arrays[1]:
+        raise RuntimeError(f"scipy {version} no longer keeps LSODA's state where checkpoints expect it; "
+                           "checkpoint this run with integrator='leapfrog' or 'yoshida4' instead")
+    return version, lsoda
+
+
+class ChunkSolver:
+    """
+    One integration continued from chunk to chunk, whose state can be saved and restored
+
+    chunks() hands out the solution like solve_chunks; between two chunks,
+    snapshot() copies everything the rest of the run depends on: the state,
+    the output row reached and the integrator's own memory (LSODA's step
+    size, order and history, or the accelerations a fixed-step scheme
+    carries over). restore() puts a snapshot back into a fresh solver of the
+    same run, which then continues exactly as the original would have.
+    """
+
+    def __init__(self, init_params, time_span, masses, K1, K2, v_com=None, integrator="odeint",
+                 gravity_solver="direct", theta=0.5, substeps=16, jacobian=True):
+        """
+        Function to set up an integration (parameters are those of nbody.integrators.solve)
+        """
+        self.time_span = np.asarray(time_span, dtype="float64")
+        self.state = np.array(init_params, dtype="float64")
+        self.row = 0  # Rows of time_span handed out so far; state is the last of them
+        self.integrator = integrator
+        if integrator == "odeint":
+            import scipy.integrate  # Imported here: it alone costs more than the rest of the core
+
+            # The LSODA solver behind odeint with odeint's tolerances, stepped from one output time to the next
+            jac = None
+            if gravity_solver == "barnes-hut":
+                derivatives = partial(barnes_hut_derivatives, masses=masses, K1=K1, K2=K2, v_com=v_com, theta=theta)
+            else:
+                derivatives = partial(nbody_derivatives, masses=masses, K1=K1, K2=K2, v_com=v_com)
+                if jacobian:
+                    jac = partial(nbody_jacobian, masses=masses, K1=K1, K2=K2)
+            self._solver = scipy.integrate.ode(lambda t, w: derivatives(w, t),
+                                               None if jac is None else lambda t, w: jac(w, t))
+            self._solver.set_integrator("lsoda", rtol=ODEINT_TOLERANCE, atol=ODEINT_TOLERANCE)
+            self._solver.set_initial_value(self.state, self.time_span[0])
+        else:
+            # The steps of fixed_step_solve, with its time step, carried over from chunk to chunk
+            self._step = STEPS[integrator]
+            self._accelerations = partial(barnes_hut_accelerations, theta=theta) if gravity_solver == "barnes-hut" \
+                else nbody_accelerations
+            steps = len(self.time_span)
+            self._dt = (self.time_span[-1] - self.time_span[0]) / (steps - 1) / substeps if steps > 1 else 0.0
+            self._substeps = substeps
+            self._masses, self._K1, self._K2, self._v_com = masses, K1, K2, v_com
+            self._a = None
+
+    @property
+    def time(self):
+        """
+        Time of the current state
+        """
+        return self.time_span[max(self.row - 1, 0)]
+
+    def _advance(self, t):
+        """
+        Function to integrate the state up to time t
+        """
+        if self.integrator == "odeint":
+            self.state[:] = self._solver.integrate(t)
+            if not self._solver.successful():
+                raise RuntimeError(f"Integration failed at t = {self._solver.t}")
+            return
+        r, v = self.state.reshape(2, -1, 3)
+        for _ in range(self._substeps):
+            self._a = self._step(r, v, self._a, self._masses, self._K1, self._K2, self._dt, self._v_com,
+                                 self._accelerations)
+
+    def chunks(self, chunk=STREAM_CHUNK):
+        """
+        Function to hand out the rest of the solution
+        :param chunk: Output times per chunk
+        :return: Generator of tuples (times, states), as solve_chunks
+        """
+        while self.row < len(self.time_span):
+            times = self.time_span[self.row:self.row + chunk]
+            states = np.empty((len(times), len(self.state)))
+            for k, t in enumerate(times):
+                if self.row > 0:
+                    self._advance(t)
+                states[k] = self.state
+                self.row += 1
+            yield times, states
+
+    def snapshot(self):
+        """
+        Function to copy the state of the run
+        :return: Dictionary of arrays: row, t, state and the integrator's memory
+                 (exact is False when this scipy keeps LSODA's memory out of reach, see restore)
+        """
+        snapshot = dict(row=np.array(self.row), t=np.array(self.time), state=self.state.copy(), exact=np.array(True))
+        if self.integrator == "odeint":
+            version, lsoda = _lsoda_internals(self._solver)
+            snapshot["scipy"] = np.array(version)
+            snapshot["exact"] = np.array(lsoda is not None)
+            if lsoda is not None:
+                snapshot.update((name, np.array(getattr(lsoda, name))) for name in LSODA_STATE)
+                snapshot["istate"] = np.array(lsoda.call_args[3])
+        else:
+            snapshot["dt"] = np.array(self._dt)
+            if self._a is not None:
+                snapshot["a"] = self._a.copy()
+        return snapshot
+
+    def restore(self, snapshot):
+        """
+        Function to continue from a snapshot of the same run
+        :param snapshot: Dictionary from snapshot()
+        Resuming odeint is bit for bit only when the snapshot was taken and is restored with the same scipy,
+        1.15 or later (LSODA's memory is private to scipy, and older versions keep it in Fortran globals).
+        A snapshot without that memory makes LSODA restart at the snapshot's state, with a RuntimeWarning:
+        the run continues closely but not bit for bit. The fixed-step integrators always resume exactly.
+        A snapshot whose LSODA memory this scipy cannot take back raises ValueError.
+        """
+        self.row = int(snapshot["row"])
+        self.state[:] = snapshot["state"]
+        if self.integrator == "odeint":
+            self._solver.set_initial_value(self.state, float(snapshot["t"]))
+            version, lsoda = _lsoda_internals(self._solver)
+            if bool(snapshot["exact"]):
+                saved = str(snapshot["scipy"]) if "scipy" in snapshot else "unknown"
+                if lsoda is None or saved != version:
+                    raise ValueError(f"The checkpoint holds LSODA's state from scipy {saved}, which scipy {version} "
+                                     "cannot restore: resume with the scipy that wrote it")
+                for name in LSODA_STATE:
+                    target = getattr(lsoda, name)
+                    if target.shape != snapshot[name].shape or target.dtype != snapshot[name].dtype:
+                        raise ValueError(f"LSODA's {name} of the checkpoint does not match scipy {version}'s")
+                    target[:] = snapshot[name]  # In place: the C code holds these arrays
+                lsoda.call_args[3] = int(snapshot["istate"])
+            elif self.row > 1:
+                warnings.warn(f"LSODA restarts at t = {float(snapshot['t'])}: the checkpoint was written with scipy "
+                              f"{snapshot['scipy'] if 'scipy' in snapshot else 'before 1.15'}, without LSODA's state, "
+                              "so the resumed run is approximate", RuntimeWarning, stacklevel=2)
+        else:
+            self._a = np.array(snapshot["a"]) if "a" in snapshot else None
+
+
+def solve_chunks(init_params, time_span, masses, K1, K2, v_com=None, integrator="odeint", gravity_solver="direct",
+                 theta=0.5, substeps=16, jacobian=True, chunk=STREAM_CHUNK):
+    """
+    Function to integrate a system like nbody.integrators.solve, handing out the solution as it is computed
+    :param chunk: Output times per chunk
+    (the other parameters are those of solve)
+    :return: Generator of tuples (times, states): consecutive pieces of time_span, shape (≤ chunk,), and the
+             states at those times, shape (≤ chunk, 6N); concatenated, the same array as solve returns
+    """
+    solver = ChunkSolver(init_params, time_span, masses, K1, K2, v_com, integrator=integrator,
+                         gravity_solver=gravity_solver, theta=theta, substeps=substeps, jacobian=jacobian)
+    return solver.chunks(chunk)
+
+
+class _Finished:
+    """
+    End of a prefetched stream, carrying the exception that ended it, if any
+    """
+
+    def __init__(self, error=None):
+        self.error = error
+
+
+def prefetch(items, depth=STREAM_DEPTH):
+    """
+    Function to run a generator on a producer thread, up to depth items ahead of the consumer
+    :param items: Iterable, e.g. solve_chunks(...)
+    :param depth: Items waiting in the queue before the producer pauses
+    :return: Generator of the same items; an exception raised by the producer is raised here
+    """
+    ready = queue.Queue(maxsize=depth)
+    stop = threading.Event()  # Set when the consumer is gone
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in items:
+                if not put(item):
+                    return
+        except Exception as exc:  # Handed to the consumer
+            put(_Finished(exc))
+            return
+        put(_Finished())
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while not isinstance(item := ready.get(), _Finished):
+            yield item
+        if item.error is not None:
+            raise item.error
+    finally:
+        stop.set()
+        thread.join()
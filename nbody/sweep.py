@@ -0,0 +1,130 @@
+# Parameter sweeps of the scripted systems spread over a process pool
+#
+#   python -m nbody.sweep 3body --grid '{"m3": [0.8, 1.0, 1.2], "v3": [[0, -0.01, 0], [0, -0.02, 0]]}' \
+#       --output sweep_3body.npz --workers 8
+#
+# Workers only import this physics package (NumPy and SciPy), never matplotlib.
+
+import argparse
+import itertools
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np  # For numerical calculations
+
+from nbody.ensemble import escaped_bodies, pair_distances
+from nbody.equations import total_energy
+from nbody.integrators import solve
+from nbody.constants import K1, K2
+from nbody.scenarios import SCENARIOS, initial_conditions
+
+
+def parameter_grid(**axes):
+    """
+    Function to expand value lists into every combination of parameters
+    :param axes: Parameter name -> list of values, e.g. m3=[0.8, 1.0], v3=[[0, -0.01, 0], [0, -0.02, 0]]
+    :return: List of parameter dictionaries (the cartesian product)
+    """
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+
+def run_one(scenario, params, periods=30, points=750, integrator="odeint", substeps=16, escape_radius=10.0):
+    """
+    Function to integrate one parameter set and summarize the run
+    :param scenario: Key of nbody.scenarios.SCENARIOS
+    :param params: Overrides of the scenario's m*, r*, v* entries
+    :param periods: Length of the run in orbital periods
+    :param points: Number of stored time points
+    :param integrator: "odeint", "leapfrog" or "yoshida4"
+    :param substeps: Fixed steps between stored points (leapfrog / yoshida4 only)
+    :param escape_radius: Distance from the centre of mass used by the escape test
+    :return: Dictionary with the final state, closest approach, escape flag and energy error
+    """
+    masses, r, v, v_com = initial_conditions(scenario, **params)
+    init_params = np.concatenate((r.ravel(), v.ravel()))
+    time_span = np.linspace(0, periods, points)
+
+    sol = solve(init_params, time_span, masses, K1, K2, v_com, integrator=integrator, substeps=substeps)
+
+    state = sol.reshape(points, 2, len(masses), 3)
+    energy = total_energy(state[[0, -1], 0], state[[0, -1], 1], masses, K1, K2)
+    return {
+        "final_r": state[-1, 0],
+        "final_v": state[-1, 1],
+        "min_distance": pair_distances(state[:, 0]).min(),
+        "escaped": escaped_bodies(state[-1, 0], state[-1, 1], masses, K1, K2, escape_radius).any(),
+        "energy_error": abs((energy[1] - energy[0]) / energy[0]),
+    }
+
+
+def _run_chunk(scenario, chunk, settings):
+    """
+    Function run inside a worker: integrate a chunk of parameter sets
+    """
+    return [run_one(scenario, params, **settings) for params in chunk]
+
+
+def run_sweep(scenario, param_sets, output=None, workers=None, chunksize=8, **settings):
+    """
+    Function to integrate many parameter sets in parallel and collect the results column by column
+    :param scenario: Key of nbody.scenarios.SCENARIOS
+    :param param_sets: List of parameter dictionaries (see parameter_grid)
+    :param output: Optional .npz path for the columnar results
+    :param workers: Number of worker processes (default: one per CPU)
+    :param chunksize: Parameter sets sent to a worker per task
+    :param settings: Keyword arguments passed on to run_one
+    :return: Dictionary of column name -> array with one row per parameter set
+    """
+    param_sets = list(param_sets)
+    chunks = [param_sets[k:k + chunksize] for k in range(0, len(param_sets), chunksize)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_run_chunk, scenario, chunk, settings) for chunk in chunks]
+        results = [row for future in futures for row in future.result()]
+
+    # Every input parameter becomes a column, filled with the scenario's value where not swept
+    columns = {}
+    defaults = SCENARIOS[scenario]
+    for name in defaults:
+        if name[0] in "mrv":
+            columns[name] = np.array([params.get(name, defaults[name]) for params in param_sets], dtype="float64")
+    if results:
+        for name in results[0]:
+            columns[name] = np.array([row[name] for row in results])
+
+    if output is not None:
+        np.savez(output, **columns)
+    return columns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parameter sweep of a scripted N-body system")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    sets = parser.add_mutually_exclusive_group(required=True)
+    sets.add_argument("--grid", help='JSON object of value lists, e.g. \'{"m3": [0.8, 1.0]}\'')
+    sets.add_argument("--list", help="JSON file holding a list of parameter objects")
+    parser.add_argument("--output", default="sweep.npz")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunksize", type=int, default=8)
+    parser.add_argument("--periods", type=float, default=30)
+    parser.add_argument("--points", type=int, default=750)
+    parser.add_argument("--integrator", default="odeint", choices=["odeint", "leapfrog", "yoshida4"])
+    parser.add_argument("--substeps", type=int, default=16)
+    args = parser.parse_args()
+
+    if args.grid:
+        param_sets = parameter_grid(**json.loads(args.grid))
+    else:
+        with open(args.list) as f:
+            param_sets = json.load(f)
+    if not param_sets:
+        parser.error("no parameter sets to run: every --grid list needs a value and --list at least one object")
+
+    columns = run_sweep(args.scenario, param_sets, output=args.output, workers=args.workers,
+                        chunksize=args.chunksize, periods=args.periods, points=args.points,
+                        integrator=args.integrator, substeps=args.substeps)
+    print(f"{len(param_sets)} runs, {int(columns['escaped'].sum())} with an escape, saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()